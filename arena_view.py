@@ -0,0 +1,88 @@
+import arcade
+import numpy as np
+
+from simulation import TILE
+from tilegrid import OBSTACLE, WALL
+
+WALL_COLORS = {WALL: arcade.color.WHITE, OBSTACLE: arcade.color.SILVER}
+ENEMY_COLORS = {"chaser": arcade.color.DODGER_BLUE, "boss": arcade.color.DARK_MAGENTA,
+                "armored": arcade.color.STEEL_BLUE}
+TERRAIN_COLORS = {"mud": arcade.color.DARK_BROWN, "ice": arcade.color.PALE_BLUE,
+                  "medium": arcade.color.LIGHT_GRAY}
+
+
+class ArenaView:
+    """Draws a `Simulation` from its arrays at draw time.
+
+    The simulation owns no sprites. Terrain patch and wall sprites are
+    placed from the grids only when they need re-baking (see `StaticLayer`)
+    and are reused from round to round. Enemies, like shots, are drawn as
+    batched squares from the position array, with no per-enemy sprite.
+    """
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.player_list = arcade.SpriteList()
+        self.player_sprite = arcade.SpriteSolidColor(TILE, TILE, color=arcade.color.RED)
+        self.player_list.append(self.player_sprite)
+        self.terrain_list = arcade.SpriteList()
+        self.wall_list = arcade.SpriteList()
+        self._spare_walls: list[arcade.Sprite] = []  # Shared by both static lists
+
+    def _place(self, sprites: arcade.SpriteList, layer: np.ndarray, colors: list):
+        """One sprite per non-zero tile of ``layer``, tinted ``colors[value]``."""
+        rows, cols = np.nonzero(layer)
+        while len(sprites) < len(rows):
+            sprites.append(self._spare_walls.pop() if self._spare_walls
+                           else arcade.SpriteSolidColor(TILE, TILE, color=arcade.color.WHITE))
+        while len(sprites) > len(rows):
+            self._spare_walls.append(sprites.pop())
+        for sprite, r, c in zip(sprites, rows.tolist(), cols.tolist()):
+            sprite.color = colors[layer[r, c]]
+            sprite.position = (c * TILE + TILE // 2, r * TILE + TILE // 2)
+
+    def draw_static(self):
+        """Draw terrain patches, then every solid tile (the static layer's bake step)."""
+        sim = self.sim
+        surfaces = sim.surfaces
+        self._place(self.terrain_list, surfaces.ids,
+                    [TERRAIN_COLORS.get(name, arcade.color.LIGHT_GRAY) for name in surfaces.names])
+        self._place(self.wall_list, sim.grid.solid,
+                    [WALL_COLORS.get(kind, arcade.color.WHITE) for kind in range(max(WALL_COLORS) + 1)])
+        self.terrain_list.draw()
+        self.wall_list.draw()
+
+    def draw_enemies(self):
+        """Enemy squares straight from ``EnemyState.pos``, one batched draw per kind."""
+        sim = self.sim
+        enemies = sim.enemies
+        n = enemies.count
+        if n == 0:
+            return
+        pos, kind = enemies.pos[:n], enemies.kind[:n]
+        for k in np.unique(kind).tolist():
+            color = ENEMY_COLORS.get(sim.enemy_kinds[k], arcade.color.DODGER_BLUE)
+            arcade.draw_points(pos[kind == k].tolist(), color, TILE)
+
+    def draw(self):
+        sim = self.sim
+        self.player_sprite.position = sim.player.position
+        self.draw_enemies()
+        bullets = sim.projectiles.positions()
+        if len(bullets):
+            arcade.draw_points(bullets.tolist(), arcade.color.YELLOW, 6)
+        missiles = sim.missiles.positions()
+        if len(missiles):
+            arcade.draw_points(missiles.tolist(), arcade.color.ORANGE, 10)
+        self.player_list.draw()
+
+        target = sim.lock_target
+        if target is not None:
+            arcade.draw_lbwh_rectangle_outline(
+                target.center_x - TILE / 2,
+                target.center_y - TILE / 2,
+                TILE,
+                TILE,
+                arcade.color.YELLOW,
+                2,
+            )
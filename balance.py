@@ -0,0 +1,241 @@
+"""Headless balance runs: many seeded rounds, a bot player, a process pool.
+
+Each task plays one wave round (see ``data/waves.json``) under one set of
+table overrides with one seed, and returns that round's stats: mean
+time-to-kill, clear time, shots fired, accuracy and damage taken. Results
+stream to a JSON-lines file as they finish; the report aggregates them per
+variant. Every variant plays the same seeds, so differences come from the
+overrides alone.
+
+    python balance.py [--rounds N] [--round NAME] [--player bot|scripted]
+                      [-p enemies.chaser.hp=60,80,100] [-p weapon=mg,shotgun,rocket]
+                      [--workers N] [--out rounds.jsonl] [--report report.json]
+
+Override keys are ``weapon``, ``quality``, ``grip``, or a table path down to
+a record field such as ``weapons.rocket.purple.splash_radius`` or
+``enemies.chaser.max_speed``.
+"""
+import argparse
+import copy
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+SEED = 1234
+KITE_TILES = 6  # The bot backs off from anything closer than this
+SIM_KEYS = ("weapon", "quality", "grip")  # Overrides applied to the sim, not the tables
+METRICS = ("ttk_s", "clear_s", "shots", "accuracy", "damage_taken", "kills")
+
+# Per-worker state, filled lazily in the worker process
+_BASE_TABLES = None
+_SIMS: dict = {}
+
+
+def bot_inputs(sim):
+    """Kiting bot: keep firing, back away from the nearest enemy toward open floor."""
+    from simulation import InputState, SCREEN_H, SCREEN_W, TILE
+    px, py = sim.player.center_x, sim.player.center_y
+    inputs = InputState(fire=sim.enemies.count > 0)
+    idx, dist = sim.nearby_enemies().nearest(px, py, KITE_TILES * TILE)
+    # Pull toward the centre so kiting does not pin the bot in a corner
+    cx = (SCREEN_W / 2 - px) / (SCREEN_W / 2)
+    cy = (SCREEN_H / 2 - py) / (SCREEN_H / 2)
+    if idx < 0:
+        if math.hypot(cx, cy) < 0.2:
+            return inputs
+        dx, dy = cx, cy
+    else:
+        ex, ey = sim.enemies.pos[idx]
+        dx = (px - ex) / max(dist, 1e-6) + cx
+        dy = (py - ey) / max(dist, 1e-6) + cy
+        inputs.dash = dist < 2 * TILE
+    length = math.hypot(dx, dy)
+    if length > 0:
+        inputs.right = dx > 0.38 * length
+        inputs.left = dx < -0.38 * length
+        inputs.up = dy > 0.38 * length
+        inputs.down = dy < -0.38 * length
+    return inputs
+
+
+def apply_overrides(tables, overrides: dict):
+    """Copy of ``tables`` with record fields replaced; returns (tables, changed names)."""
+    tables = copy.copy(tables)
+    changed = set()
+    for key, value in overrides.items():
+        if key in SIM_KEYS:
+            continue
+        table, *path, field = key.split(".")
+        if not path:
+            raise ValueError(f"{key}: expected table.path.field")
+        if table not in changed:
+            setattr(tables, table, copy.deepcopy(getattr(tables, table)))
+            changed.add(table)
+        container = getattr(tables, table)
+        for name in path[:-1]:
+            container = container[name]
+        record = container[path[-1]]
+        if field not in record._fields:
+            raise ValueError(f"{key}: {type(record).__name__} has no field {field!r}")
+        kind = type(record).__annotations__[field]
+        container[path[-1]] = record._replace(**{field: kind(value)})
+    return tables, sorted(changed)
+
+
+def _variant_sim(overrides: tuple, round_index: int):
+    """One reusable Simulation per (variant, round) in this worker."""
+    global _BASE_TABLES
+    key = (overrides, round_index)
+    entry = _SIMS.get(key)
+    if entry is not None:
+        return entry
+    from simulation import Simulation
+    from tables import Tables
+    if _BASE_TABLES is None:
+        _BASE_TABLES = Tables()
+    params = dict(overrides)
+    tables, _ = apply_overrides(_BASE_TABLES, params)
+    sim = Simulation(seed=0, tables=tables)
+    if "weapon" in params:
+        sim.set_weapon(params["weapon"])
+    if "quality" in params:
+        sim.set_quality(params["quality"])
+    if "grip" in params:
+        sim.apply_grip_preset(params["grip"])
+    sim.waves.first_round = round_index
+    lifetimes: list[float] = []
+    sim.on_enemy_death.append(lambda event: lifetimes.append(event.lifetime))
+    entry = _SIMS[key] = (sim, lifetimes)
+    return entry
+
+
+def play_round(task: tuple) -> dict:
+    variant, overrides, round_index, seed, player, max_time = task
+    from bench import scripted_inputs
+    from simulation import FIXED_DT
+    sim, lifetimes = _variant_sim(overrides, round_index)
+    sim.reset_round(seed)
+    lifetimes.clear()
+    sim.start()
+    cleared = False
+    for tick in range(int(max_time / FIXED_DT)):
+        inputs = bot_inputs(sim) if player == "bot" else scripted_inputs({"fire": True}, tick)
+        sim.step(inputs)
+        if not sim.waves.live:
+            cleared = True
+            break
+    return {
+        "variant": variant,
+        "seed": seed,
+        "round": sim.waves.round_name,
+        "cleared": cleared,
+        "clear_s": sim.time if cleared else None,
+        "ttk_s": sum(lifetimes) / len(lifetimes) if lifetimes else None,
+        "kills": sim.kill_count,
+        "left": sim.enemies.count + sim.waves.pending,
+        "shots": sim.shots_fired,
+        "hits": sim.shots_hit,
+        "accuracy": sim.shots_hit / sim.shots_fired if sim.shots_fired else None,
+        "damage_taken": sim.damage_taken,
+    }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def aggregate(results: list[dict]) -> dict:
+    by_variant: dict[str, list[dict]] = {}
+    for r in results:
+        by_variant.setdefault(r["variant"], []).append(r)
+    report = {}
+    for variant, rows in by_variant.items():
+        summary = {"rounds": len(rows), "clear_rate": sum(r["cleared"] for r in rows) / len(rows)}
+        for metric in METRICS:
+            values = [r[metric] for r in rows if r[metric] is not None]
+            if values:
+                summary[metric] = {
+                    "mean": sum(values) / len(values),
+                    "p50": _percentile(values, 0.5),
+                    "p90": _percentile(values, 0.9),
+                }
+        report[variant] = summary
+    return report
+
+
+def variants(params: list[str]) -> list[tuple[str, tuple]]:
+    """Cartesian product of ``key=v1,v2`` sweeps -> [(label, overrides)]."""
+    axes = []
+    for spec in params:
+        key, _, values = spec.partition("=")
+        if not values:
+            raise SystemExit(f"bad -p {spec!r}: expected key=value[,value...]")
+        axes.append([(key, v if key in SIM_KEYS else float(v)) for v in values.split(",")])
+    out = []
+    for combo in itertools.product(*axes):
+        label = " ".join(f"{k}={v}" for k, v in combo) or "baseline"
+        out.append((label, tuple(combo)))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless balance rounds across a process pool.")
+    parser.add_argument("--rounds", type=int, default=200, help="rounds per variant")
+    parser.add_argument("--round", help="wave round to play (default: the first)")
+    parser.add_argument("--player", choices=("bot", "scripted"), default="bot")
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="KEY=V1,V2")
+    parser.add_argument("--max-time", type=float, default=180.0, help="give up on a round after this many sim seconds")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", help="stream per-round results here (JSON lines)")
+    parser.add_argument("--report", help="write the aggregate report here instead of stdout")
+    args = parser.parse_args()
+
+    from tables import Tables
+    round_names = list(Tables().waves)
+    round_index = 0
+    if args.round is not None:
+        if args.round not in round_names:
+            raise SystemExit(f"unknown round {args.round!r}; have {round_names}")
+        round_index = round_names.index(args.round)
+
+    tasks = [(label, overrides, round_index, args.seed + i, args.player, args.max_time)
+             for label, overrides in variants(args.param) for i in range(args.rounds)]
+    chunksize = max(1, len(tasks) // (args.workers * 16))
+    results = []
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    start = time.perf_counter()
+    try:
+        with multiprocessing.Pool(args.workers) as pool:
+            for done, result in enumerate(pool.imap_unordered(play_round, tasks, chunksize), 1):
+                results.append(result)
+                if out is not None:
+                    out.write(json.dumps(result) + "\n")
+                if done % 100 == 0 or done == len(tasks):
+                    elapsed = time.perf_counter() - start
+                    print(f"{done}/{len(tasks)} rounds  {elapsed:.1f}s  ({done / elapsed:.1f} rounds/s)",
+                          file=sys.stderr)
+    finally:
+        if out is not None:
+            out.close()
+
+    text = json.dumps({
+        "meta": {"rounds_per_variant": args.rounds, "round": round_names[round_index],
+                 "player": args.player, "seed": args.seed, "workers": args.workers,
+                 "elapsed_s": time.perf_counter() - start},
+        "variants": aggregate(results),
+    }, indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Scenario benchmarks for the simulation hot paths.
+
+Each scenario runs in a fresh process (so peak RSS is its own) with a fixed
+seed and a scripted input pattern, and reports ticks/s, per-tick latency
+percentiles, peak RSS and allocation figures as JSON.
+
+    python bench.py list
+    python bench.py run [-s NAME ...] [--ticks N] [--out results.json]
+    python bench.py compare old.json new.json [--threshold 0.10]
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+SCENARIOS = {
+    "empty_arena":     {"density": 0.0,  "enemies": 0},
+    "default_round":   {"density": 0.03, "enemies": None},
+    "enemies_50":      {"density": 0.03, "enemies": 50},
+    "enemies_500":     {"density": 0.03, "enemies": 500},
+    "enemies_5000":    {"density": 0.03, "enemies": 5000},
+    "purple_mg":       {"density": 0.03, "enemies": 50, "quality": "purple", "fire": True},
+    "shotgun_500":     {"density": 0.03, "enemies": 500, "weapon": "shotgun", "fire": True},
+    "rockets_500":     {"density": 0.03, "enemies": 500, "weapon": "rocket", "quality": "purple", "fire": True},
+    "missiles_500":    {"density": 0.03, "enemies": 500, "missile": True},
+    "dense_obstacles": {"density": 0.12, "enemies": 50},
+    "dense_500":       {"density": 0.12, "enemies": 500, "fire": True},
+    "ice":             {"density": 0.03, "enemies": 50, "grip": "ice"},
+    "mud":             {"density": 0.03, "enemies": 50, "grip": "mud"},
+}
+
+SEED = 1234
+ALLOC_TICKS = 200
+
+# Metric -> True when larger is better
+_METRICS = {
+    "ticks_per_sec": True,
+    "p50_us": False,
+    "p95_us": False,
+    "p99_us": False,
+    "peak_rss_kb": False,
+    "alloc_blocks_per_tick": False,
+    "transient_kb_per_tick": False,
+}
+
+
+def scripted_inputs(cfg: dict, tick: int):
+    """Deterministic bot: sweep through the 8 directions, dash now and then."""
+    from simulation import InputState
+    d = (tick // 60) % 8
+    inputs = InputState(
+        right=d in (0, 1, 7), left=d in (3, 4, 5),
+        up=d in (1, 2, 3), down=d in (5, 6, 7),
+        fire=cfg.get("fire", False),
+        dash=tick % 400 == 399,
+        missile=cfg.get("missile", False) and tick % 30 == 0,
+    )
+    if tick == 0:
+        inputs.weapon = cfg.get("weapon")
+        inputs.quality = cfg.get("quality")
+        inputs.grip = cfg.get("grip")
+    return inputs
+
+
+def build(cfg: dict):
+    """Simulation for a scenario; crowds may share tiles (jittered in-cell)."""
+    import numpy as np
+    from simulation import Simulation, TILE, ENEMY_BODY_HALF
+
+    count = cfg["enemies"]
+    sim = Simulation(seed=SEED, obstacle_density=cfg["density"],
+                     enemy_count=None if count is None else 0)
+    sim.start()
+    if not count:
+        return sim
+    rows, cols = np.nonzero(sim.grid.solid == 0)
+    px, py = sim.player.center_x, sim.player.center_y
+    cx, cy = (cols + 0.5) * TILE, (rows + 0.5) * TILE
+    far = np.hypot(cx - px, cy - py) >= 5 * TILE
+    cells = list(zip(cx[far].tolist(), cy[far].tolist()))
+    jitter = TILE / 2 - ENEMY_BODY_HALF
+    for _ in range(count):
+        x, y = sim.rng.choice(cells)
+        sim.spawn_enemy(x + sim.rng.uniform(-jitter, jitter), y + sim.rng.uniform(-jitter, jitter))
+    return sim
+
+
+def _percentile(sorted_ns: list[int], q: float) -> float:
+    i = min(len(sorted_ns) - 1, int(round(q * (len(sorted_ns) - 1))))
+    return sorted_ns[i] / 1000.0
+
+
+def run_scenario(name: str, ticks: int) -> dict:
+    cfg = SCENARIOS[name]
+    sim = build(cfg)
+    timings = []
+    blocks_before = sys.getallocatedblocks()
+    start = time.perf_counter()
+    for tick in range(ticks):
+        inputs = scripted_inputs(cfg, tick)
+        t0 = time.perf_counter_ns()
+        sim.step(inputs)
+        timings.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - start
+    blocks_after = sys.getallocatedblocks()
+
+    # Separate short pass so tracing does not skew the timings
+    tracemalloc.start()
+    transient = 0
+    for tick in range(ticks, ticks + ALLOC_TICKS):
+        inputs = scripted_inputs(cfg, tick)
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        sim.step(inputs)
+        transient += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "ticks": ticks,
+        "ticks_per_sec": ticks / elapsed,
+        "p50_us": _percentile(timings, 0.50),
+        "p95_us": _percentile(timings, 0.95),
+        "p99_us": _percentile(timings, 0.99),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "alloc_blocks_per_tick": (blocks_after - blocks_before) / ticks,
+        "transient_kb_per_tick": transient / ALLOC_TICKS / 1024,
+        "enemies_left": sim.enemies.count,
+        "kills": sim.kill_count,
+    }
+
+
+def run(names: list[str], ticks: int) -> dict:
+    import numpy as np
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for name in names:
+        with ctx.Pool(1) as pool:
+            results[name] = pool.apply(run_scenario, (name, ticks))
+        r = results[name]
+        print(f"{name:16s} {r['ticks_per_sec']:9.0f} ticks/s  p50 {r['p50_us']:8.1f}us  "
+              f"p95 {r['p95_us']:8.1f}us  p99 {r['p99_us']:8.1f}us  rss {r['peak_rss_kb'] // 1024} MB",
+              file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": SEED,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": results,
+    }
+
+
+def compare(old: dict, new: dict, threshold: float) -> list[str]:
+    """Human-readable regressions of ``new`` against ``old``."""
+    problems = []
+    for name, before in old["scenarios"].items():
+        after = new["scenarios"].get(name)
+        if after is None:
+            continue
+        for metric, higher_is_better in _METRICS.items():
+            a, b = before.get(metric), after.get(metric)
+            if a is None or b is None or a <= 0:
+                continue
+            change = (b - a) / a
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                problems.append(f"{name}.{metric}: {a:.3g} -> {b:.3g} ({change:+.1%})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation scenario benchmarks.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    p_run = sub.add_parser("run")
+    p_run.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS))
+    p_run.add_argument("--ticks", type=int, default=2400)
+    p_run.add_argument("--out", help="write JSON here instead of stdout")
+    p_cmp = sub.add_parser("compare")
+    p_cmp.add_argument("old")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="relative change that counts as a regression")
+    args = parser.parse_args()
+
+    if args.cmd == "list":
+        for name, cfg in SCENARIOS.items():
+            print(f"{name:16s} {cfg}")
+    elif args.cmd == "run":
+        report = run(args.scenario or list(SCENARIOS), args.ticks)
+        text = json.dumps(report, indent=2)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+    else:
+        with open(args.old, encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+        problems = compare(old, new, args.threshold)
+        for line in problems:
+            print("REGRESSION", line)
+        if not problems:
+            print("no regressions")
+        sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
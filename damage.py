@@ -0,0 +1,168 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from timers import TimerWheel
+
+REGEN_DELAY = 3.0  # s without hits before armor starts to regenerate
+BURN_PULSE = 0.25  # s between incendiary damage ticks
+
+# Timer kinds
+_REGEN, _BURN = 0, 1
+
+
+class CombatTick(NamedTuple):
+    """What one tick's damage pass did, one entry per enemy row hit."""
+    tick: int
+    rows: np.ndarray  # `EnemyState` rows (valid until the kills are removed)
+    hp_damage: np.ndarray
+    armor_damage: np.ndarray
+    killed: np.ndarray  # Rows this pass killed
+
+
+class DamageQueue:
+    """Compact per-tick damage events: parallel arrays with a fill count."""
+
+    def __init__(self, capacity: int = 256):
+        self.count = 0
+        self.row = np.zeros(capacity, dtype=np.intp)
+        self.amount = np.zeros(capacity)
+        self.pierce = np.zeros(capacity)  # Fraction that skips armor
+        self.burn_dps = np.zeros(capacity)
+        self.burn_time = np.zeros(capacity)
+
+    def push(self, rows: np.ndarray, amounts, pierce=0.0, burn_dps=0.0, burn_time=0.0):
+        """Queue one event per entry of ``rows``; the rest broadcast."""
+        k = len(rows)
+        if k == 0:
+            return
+        end = self.count + k
+        if end > len(self.row):
+            capacity = len(self.row)
+            while capacity < end:
+                capacity *= 2
+            for name in ("row", "amount", "pierce", "burn_dps", "burn_time"):
+                old = getattr(self, name)
+                new = np.zeros(capacity, dtype=old.dtype)
+                new[:self.count] = old[:self.count]
+                setattr(self, name, new)
+        s = slice(self.count, end)
+        self.row[s] = rows
+        self.amount[s] = amounts
+        self.pierce[s] = pierce
+        self.burn_dps[s] = burn_dps
+        self.burn_time[s] = burn_time
+        self.count = end
+
+
+class DamageSystem:
+    """Queued damage against `EnemyState`, applied in one pass per tick.
+
+    Collision code only pushes events onto ``queue``. `update()` then fires
+    due timers (armor regen starts, burn pulses), applies every queued event
+    at once (per row: armor soaks the non-piercing part, the rest and the
+    piercing part come off hp), and regenerates armor on the flagged rows.
+    Timers live on a `TimerWheel`, one per enemy and effect at most, so
+    nothing checks its own timers every tick. The last pass is kept as
+    ``log`` (a `CombatTick`).
+    """
+
+    def __init__(self, enemies, dt: float):
+        self.enemies = enemies
+        self.dt = dt
+        self.queue = DamageQueue()
+        self.wheel = TimerWheel()
+        empty = np.zeros(0, dtype=np.intp)
+        self._quiet = CombatTick(-1, empty, np.zeros(0), np.zeros(0), empty)  # Log of a hitless tick
+        self.log = self._quiet
+        self._regenerating = False  # Some row may still have regen set
+
+    def clear(self):
+        self.queue.count = 0
+        self.wheel.clear()
+        self._regenerating = False
+
+    def _ticks(self, seconds: float) -> int:
+        return int(round(seconds / self.dt))
+
+    def _schedule(self, row: int, seconds: float, what: int):
+        state = self.enemies
+        self.wheel.schedule(self._ticks(seconds), (state.handles[row], int(state.serial[row]), what))
+
+    def _row(self, handle, serial: int) -> int:
+        """Current row of a timer's enemy, or -1 if it is gone."""
+        state = self.enemies
+        if handle.state is not state or state.serial[handle.slot] != serial:
+            return -1
+        return handle.slot
+
+    def update(self, tick: int, now: float) -> np.ndarray:
+        """Fire timers, apply the queue and regen armor; returns the rows killed."""
+        if not (self.queue.count or self.wheel.size or self._regenerating):
+            self.wheel.tick += 1
+            self.log = self._quiet
+            return self._quiet.killed
+        state = self.enemies
+        eps = self.dt / 2
+        for handle, serial, what in self.wheel.advance():
+            row = self._row(handle, serial)
+            if row < 0:
+                continue
+            if what == _REGEN:
+                if state.regen_at[row] > now + eps:  # Hit again since; wait out the rest
+                    self._schedule(row, state.regen_at[row] - now, _REGEN)
+                else:
+                    state.regen_pending[row] = False
+                    state.regen[row] = state.armor[row] < state.armor_max[row]
+                    self._regenerating = True
+            elif state.burn_until[row] > now - eps:
+                self.queue.push(np.array([row]), state.burn_dps[row] * BURN_PULSE)
+                if state.burn_until[row] > now + eps:
+                    self._schedule(row, BURN_PULSE, _BURN)
+
+        killed = self._apply(tick, now)
+
+        if self._regenerating:
+            regen = np.flatnonzero(state.regen[:state.count])
+            armor = np.minimum(state.armor[regen] + state.armor_regen[regen] * self.dt, state.armor_max[regen])
+            state.armor[regen] = armor
+            state.regen[regen] = still = armor < state.armor_max[regen]
+            self._regenerating = bool(still.any())
+        return killed
+
+    def _apply(self, tick: int, now: float) -> np.ndarray:
+        q, state = self.queue, self.enemies
+        k = q.count
+        if k == 0:
+            self.log = self._quiet
+            return self._quiet.killed
+        q.count = 0
+        rows, inv = np.unique(q.row[:k], return_inverse=True)
+        amount, pierce = q.amount[:k], q.pierce[:k]
+        soakable = np.bincount(inv, amount * (1.0 - pierce), len(rows))
+        piercing = np.bincount(inv, amount * pierce, len(rows))
+        absorbed = np.minimum(state.armor[rows], soakable)
+        state.armor[rows] -= absorbed
+        hp_damage = soakable - absorbed + piercing
+        state.hp[rows] -= hp_damage
+
+        # Any hit stops regen and pushes its start back
+        state.regen[rows] = False
+        state.regen_at[rows] = now + REGEN_DELAY
+        for row in rows[(state.armor_max[rows] > 0) & ~state.regen_pending[rows]].tolist():
+            state.regen_pending[row] = True
+            self._schedule(row, REGEN_DELAY, _REGEN)
+
+        # Incendiary hits refresh the burn instead of stacking it
+        for i in np.flatnonzero(q.burn_time[:k] > 0).tolist():
+            row = int(q.row[i])
+            burning = state.burn_until[row] > now
+            state.burn_until[row] = max(state.burn_until[row], now + q.burn_time[i])
+            state.burn_dps[row] = max(state.burn_dps[row], q.burn_dps[i]) if burning else q.burn_dps[i]
+            if not burning:
+                self._schedule(row, BURN_PULSE, _BURN)
+
+        killed = rows[(state.hp[rows] <= 0) & state.alive[rows]]
+        state.alive[killed] = False
+        self.log = CombatTick(tick, rows, hp_damage, absorbed, killed)
+        return killed
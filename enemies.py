@@ -0,0 +1,141 @@
+import numpy as np
+
+
+class EnemyState:
+    """Structure-of-arrays enemy buffers.
+
+    Row ``i`` belongs to ``handles[i]``; only the first ``count`` rows are live.
+    Handles give gameplay code a stable reference across swap-removes; the
+    arrays are authoritative and the renderer reads positions straight from
+    ``pos``.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.count = 0
+        self.handles: list = []
+        self._next_serial = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity: int):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.accel = np.zeros(capacity)
+        self.drag = np.zeros(capacity)
+        self.max_speed = np.zeros(capacity)
+        self.hp = np.zeros(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.kind = np.zeros(capacity, dtype=np.int16)  # Index into the enemies table
+        self.contact_dps = np.zeros(capacity)
+        self.born = np.zeros(capacity)  # Sim time of the spawn
+        self.serial = np.zeros(capacity, dtype=np.int64)  # Unique per spawn, for deferred work
+        # Armor bar and status effects (driven by `damage.DamageSystem`)
+        self.armor = np.zeros(capacity)
+        self.armor_max = np.zeros(capacity)
+        self.armor_regen = np.zeros(capacity)  # Per second once regenerating
+        self.regen = np.zeros(capacity, dtype=bool)  # Armor currently regenerating
+        self.regen_pending = np.zeros(capacity, dtype=bool)  # A regen timer is scheduled
+        self.regen_at = np.zeros(capacity)  # Sim time regen may start (last hit + delay)
+        self.burn_until = np.zeros(capacity)
+        self.burn_dps = np.zeros(capacity)
+
+    def _columns(self) -> tuple[np.ndarray, ...]:
+        return (self.pos, self.vel, self.accel, self.drag, self.max_speed, self.hp, self.alive,
+                self.kind, self.contact_dps, self.born, self.serial, self.armor, self.armor_max,
+                self.armor_regen, self.regen, self.regen_pending, self.regen_at,
+                self.burn_until, self.burn_dps)
+
+    def reserve(self, capacity: int):
+        """Grow ahead of time so spawning up to ``capacity`` rows never reallocates."""
+        if capacity <= self.capacity:
+            return
+        n = self.count
+        old = self._columns()
+        new_capacity = self.capacity
+        while new_capacity < capacity:
+            new_capacity *= 2
+        self._alloc(new_capacity)
+        for src, dst in zip(old, self._columns()):
+            dst[:n] = src[:n]
+
+    def add(self, handle, x: float, y: float, template, kind: int = 0, born: float = 0.0) -> int:
+        """Append a row initialised from an `EnemyTemplate`."""
+        if self.count == self.capacity:
+            self.reserve(self.capacity * 2)
+        i = self.count
+        self.pos[i] = (x, y)
+        self.vel[i] = 0.0
+        self.accel[i] = template.accel
+        self.drag[i] = template.drag
+        self.max_speed[i] = template.max_speed
+        self.hp[i] = template.hp
+        self.alive[i] = True
+        self.kind[i] = kind
+        self.contact_dps[i] = template.contact_dps
+        self.born[i] = born
+        self.serial[i] = self._next_serial
+        self._next_serial += 1
+        self.armor[i] = self.armor_max[i] = template.armor
+        self.armor_regen[i] = template.armor_regen
+        self.regen[i] = self.regen_pending[i] = False
+        self.regen_at[i] = self.burn_until[i] = self.burn_dps[i] = 0.0
+        self.handles.append(handle)
+        handle.state = self
+        handle.slot = i
+        self.count += 1
+        return i
+
+    def remove(self, i: int):
+        """Swap-remove row ``i`` (the last row moves into its place)."""
+        last = self.count - 1
+        gone = self.handles[i]
+        if i != last:
+            for arr in self._columns():
+                arr[i] = arr[last]
+            moved = self.handles[last]
+            self.handles[i] = moved
+            moved.slot = i
+        self.handles.pop()
+        self.alive[last] = False
+        self.count = last
+        gone.state = None
+        gone.slot = -1
+
+    def clear(self) -> list:
+        """Drop every row; returns the detached handles for reuse."""
+        handles = self.handles
+        for h in handles:
+            h.state = None
+            h.slot = -1
+        self.handles = []
+        self.alive[:self.count] = False
+        self.count = 0
+        return handles
+
+    def steer(self, targets: np.ndarray, dt: float, accel_scale=1.0, speed_scale=1.0):
+        """Seek the targets: approach desired velocity by accel*dt, clamp to max_speed.
+
+        ``targets`` is one (x, y) shared by all rows or an (n, 2) array.
+        ``accel_scale`` / ``speed_scale`` (scalar or per row) scale the
+        template accel and max_speed for this tick, e.g. by terrain.
+        """
+        n = self.count
+        if n == 0:
+            return
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+        max_speed = self.max_speed[:n] * speed_scale
+
+        to_target = np.asarray(targets, dtype=float) - pos
+        dist = np.hypot(to_target[:, 0], to_target[:, 1])
+        inv = np.divide(1.0, dist, out=np.zeros(n), where=dist > 0)
+        desired = to_target * (inv * max_speed)[:, None]
+
+        max_delta = np.maximum(self.accel[:n] * (accel_scale * dt), 0.0)[:, None]
+        vel += np.clip(desired - vel, -max_delta, max_delta)
+
+        speed = np.hypot(vel[:, 0], vel[:, 1])
+        over = speed > max_speed
+        if over.any():
+            vel[over] *= (max_speed[over] / speed[over])[:, None]
+        vel[~self.alive[:n]] = 0.0
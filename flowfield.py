@@ -0,0 +1,141 @@
+import itertools
+from collections import OrderedDict
+from typing import Iterator
+
+import numpy as np
+
+UNREACHED = np.iinfo(np.int32).max
+
+# Orthogonal steps first so ties prefer straight moves
+_NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+class FlowField:
+    """Shared chase field over a `TileGrid`, rooted at one goal tile.
+
+    A BFS wavefront (run on whole-grid NumPy masks) gives every open tile its
+    step distance to the goal; each tile then stores the neighbour to move to
+    next. Chasers look their tile up in O(1). Fields are cached per
+    (goal tile, grid version), so walking back and forth between tiles or
+    standing still costs nothing. A new field can be built a slice at a
+    time (see `set_goal`); the previous one stays in use until it is done.
+    """
+
+    def __init__(self, grid, cache_size: int = 8, steps_per_call: int = 16):
+        self.grid = grid
+        self.cache_size = cache_size
+        self.steps_per_call = steps_per_call  # Wavefront steps per budgeted `set_goal`
+        self._cache: OrderedDict[tuple, tuple[np.ndarray, np.ndarray, np.ndarray]] = OrderedDict()
+        self.goal: tuple[int, int, int] | None = None
+        self.dist = np.full((grid.rows, grid.cols), UNREACHED, dtype=np.int32)
+        self.next_c = np.zeros((grid.rows, grid.cols), dtype=np.int16)
+        self.next_r = np.zeros((grid.rows, grid.cols), dtype=np.int16)
+        self.builds = 0
+        self._pending: tuple[tuple, Iterator] | None = None  # (key, build in progress)
+
+    def set_goal(self, c: int, r: int, budget: bool = False):
+        """Point the field at tile (c, r); builds only on a cache miss.
+
+        With ``budget`` a miss advances the build by at most
+        ``steps_per_call`` wavefront steps and keeps the current field until
+        it finishes; a build already under way is finished first, so the
+        field trails a moving goal by a few calls. Budgets count steps, not
+        time, so replays stay deterministic. Without it, or when the current
+        field predates the grid's last change, the field is exact on return.
+        """
+        grid = self.grid
+        c = min(max(c, 0), grid.cols - 1)
+        r = min(max(r, 0), grid.rows - 1)
+        key = (c, r, grid.version)
+        if self.goal == key:
+            self._pending = None
+            return
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self._pending = None
+            self._use(key, cached)
+            return
+        budget = budget and self.goal is not None and self.goal[2] == grid.version
+        if self._pending is None or self._pending[0][2] != grid.version or not budget:
+            self._pending = (key, self._build(c, r))
+        self._run(self.steps_per_call if budget else None)
+
+    def _run(self, budget: int | None):
+        key, work = self._pending
+        try:
+            for _ in range(budget) if budget is not None else itertools.count():
+                next(work)
+        except StopIteration as done:
+            self._pending = None
+            self._cache[key] = done.value
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self._use(key, done.value)
+
+    def _use(self, key: tuple, field: tuple[np.ndarray, np.ndarray, np.ndarray]):
+        self.goal = key
+        self.dist, self.next_c, self.next_r = field
+
+    def _build(self, gc: int, gr: int):
+        """Generator: yields after each wavefront step, returns the finished field."""
+        self.builds += 1
+        free = self.grid.solid == 0
+        rows, cols = free.shape
+        dist = np.full((rows, cols), UNREACHED, dtype=np.int32)
+        dist[gr, gc] = 0
+        frontier = np.zeros_like(free)
+        frontier[gr, gc] = True
+        unseen = free.copy()
+        unseen[gr, gc] = False
+        step = 0
+        while frontier.any():
+            step += 1
+            grown = np.zeros_like(frontier)
+            grown[1:, :] |= frontier[:-1, :]
+            grown[:-1, :] |= frontier[1:, :]
+            grown[:, 1:] |= frontier[:, :-1]
+            grown[:, :-1] |= frontier[:, 1:]
+            grown &= unseen
+            dist[grown] = step
+            unseen &= ~grown
+            frontier = grown
+            yield
+
+        # Pick the lowest-distance neighbour per tile; no cutting wall corners
+        pad_d = np.full((rows + 2, cols + 2), UNREACHED, dtype=np.int32)
+        pad_d[1:-1, 1:-1] = dist
+        pad_free = np.zeros((rows + 2, cols + 2), dtype=bool)
+        pad_free[1:-1, 1:-1] = free
+        best = dist.copy()
+        rr, cc = np.indices((rows, cols))
+        next_c = cc.astype(np.int16)
+        next_r = rr.astype(np.int16)
+        for dc, dr in _NEIGHBORS:
+            cand = pad_d[1 + dr:rows + 1 + dr, 1 + dc:cols + 1 + dc]
+            if dc and dr:
+                open_corner = (pad_free[1 + dr:rows + 1 + dr, 1:-1]
+                               & pad_free[1:-1, 1 + dc:cols + 1 + dc])
+                cand = np.where(open_corner, cand, UNREACHED)
+            better = cand < best
+            best = np.where(better, cand, best)
+            next_c = np.where(better, cc + dc, next_c).astype(np.int16)
+            next_r = np.where(better, rr + dr, next_r).astype(np.int16)
+        return dist, next_c, next_r
+
+    def waypoints(self, pos: np.ndarray, goal_xy: tuple[float, float],
+                  tiles: tuple[np.ndarray, np.ndarray] | None = None) -> np.ndarray:
+        """Next waypoint for each position: the centre of its tile's next step.
+
+        Movers already on the goal tile, or on tiles the goal cannot be
+        reached from, head straight for ``goal_xy``. ``tiles`` passes the
+        (rows, cols) from `TileGrid.tiles_of` when the caller has them.
+        """
+        t = self.grid.tile
+        r, c = self.grid.tiles_of(pos) if tiles is None else tiles
+        out = np.empty((len(pos), 2))
+        out[:, 0] = (self.next_c[r, c] + 0.5) * t
+        out[:, 1] = (self.next_r[r, c] + 0.5) * t
+        direct = (self.dist[r, c] == 0) | (self.dist[r, c] == UNREACHED)
+        out[direct] = goal_xy
+        return out
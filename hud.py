@@ -0,0 +1,44 @@
+import arcade
+import pyglet
+
+
+class HudLine:
+    """One persistent text object; re-laid-out only when its string changes."""
+
+    def __init__(self, x: float, y: float, color, font_size: float, batch):
+        self.text = arcade.Text("", x, y, color, font_size, batch=batch)
+        self.value = ""
+
+    def set(self, value: str):
+        if value != self.value:
+            self.value = value
+            self.text.text = value
+        self.text.visible = bool(value)
+
+    def hide(self):
+        self.text.visible = False
+
+
+class Hud:
+    """Batched HUD text, drawn with a single call.
+
+    Values are refreshed at ``refresh_hz`` (well below the 120 Hz tick) via
+    `due()`; lines whose string did not change are left untouched.
+    """
+
+    def __init__(self, refresh_hz: float = 15.0):
+        self.batch = pyglet.graphics.Batch()
+        self.refresh_interval = 1.0 / refresh_hz
+        self._next_refresh = 0.0
+
+    def line(self, x: float, y: float, color=arcade.color.BLACK, font_size: float = 14) -> HudLine:
+        return HudLine(x, y, color, font_size, self.batch)
+
+    def due(self, now: float) -> bool:
+        if now < self._next_refresh:
+            return False
+        self._next_refresh = now + self.refresh_interval
+        return True
+
+    def draw(self):
+        self.batch.draw()
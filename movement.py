@@ -0,0 +1,223 @@
+"""Batched player movement model for grip preset / part sweeps.
+
+`VehicleBatch` integrates the same model as `Simulation._integrate_player`
+(traction, side-slip decay, rolling friction/drag, speed cut, dash decay and
+transfer) for many vehicles at once on an open field, each with its own
+`SurfaceParams`. `measure()` drives a batch through a standard trace and
+reports time-to-max-speed, turn slip and stopping distance.
+
+    python movement.py [--presets medium,mud,ice] [--mult traction_accel=0.6,1.0,1.6 ...]
+                       [--out sweep.csv]
+
+Part multipliers scale preset fields and are clamped to ``PART_MULT_RANGE``.
+"""
+import argparse
+import csv
+import itertools
+import math
+import sys
+import time
+
+import numpy as np
+
+from tables import SurfaceParams
+
+FIXED_DT = 1 / 120  # Same tick as the simulation
+PART_MULT_RANGE = (0.6, 1.6)
+FIELDS = SurfaceParams._fields
+
+# Standard trace: (name, seconds, input direction)
+TRACE = (
+    ("accelerate", 3.0, (1.0, 0.0)),
+    ("turn", 2.0, (0.0, 1.0)),
+    ("coast", 4.0, (0.0, 0.0)),
+)
+TOP_SPEED_FRACTION = 0.95  # "At max speed" threshold for time_to_max
+ALIGN_DEG = 10.0  # Turn counts as done once heading is within this of the input
+
+
+def part_params(preset: SurfaceParams, multipliers: np.ndarray) -> np.ndarray:
+    """(n, len(FIELDS)) parameter rows: ``preset`` scaled by clamped multipliers."""
+    lo, hi = PART_MULT_RANGE
+    return np.asarray(preset, dtype=float) * np.clip(multipliers, lo, hi)
+
+
+class VehicleBatch:
+    """SoA state for ``n`` vehicles sharing one movement model.
+
+    ``params`` is an (n, len(FIELDS)) array in `SurfaceParams` field order.
+    Dash settings default to the simulation's.
+    """
+
+    def __init__(self, params: np.ndarray, dash_impulse: float = 900.0,
+                 dash_max_speed: float = 700.0, dash_cd_max: float = 3.0):
+        params = np.atleast_2d(np.asarray(params, dtype=float))
+        self.n = n = len(params)
+        for i, name in enumerate(FIELDS):
+            setattr(self, name, params[:, i].copy())
+        self.dash_impulse = dash_impulse
+        self.dash_max_speed = dash_max_speed
+        self.dash_cd_max = dash_cd_max
+        self.pos = np.zeros((n, 2))
+        self.vel = np.zeros((n, 2))
+        self.move_vel = np.zeros((n, 2))
+        self.dash_vel = np.zeros((n, 2))
+        self.dash_cooldown = np.zeros(n)
+        self.last_dir = np.tile([1.0, 0.0], (n, 1))
+
+    def _dash(self, direction: np.ndarray, held: np.ndarray, dash: np.ndarray):
+        # As in Simulation._apply_commands: a dash with no direction held
+        # uses the last move direction and skips the cooldown check
+        ready = dash & (~held | (self.dash_cooldown <= 0))
+        d = np.where(held[:, None], direction, self.last_dir)
+        if not ready.any():
+            return
+        self.dash_vel[ready] += d[ready] * self.dash_impulse
+        speed = np.hypot(self.dash_vel[:, 0], self.dash_vel[:, 1])
+        over = ready & (speed > self.dash_max_speed)
+        self.dash_vel[over] *= (self.dash_max_speed / speed[over])[:, None]
+        self.dash_cooldown[ready] = self.dash_cd_max
+
+    def step(self, inputs: np.ndarray, dt: float = FIXED_DT, dash: np.ndarray | None = None):
+        """Advance one tick. ``inputs`` is (2,) or (n, 2) raw key axes in -1..1."""
+        n = self.n
+        raw = np.broadcast_to(np.asarray(inputs, dtype=float), (n, 2))
+        length = np.hypot(raw[:, 0], raw[:, 1])
+        held = length > 0
+        direction = raw / np.where(held, length, 1.0)[:, None]
+        if dash is not None:
+            self._dash(direction, held, np.broadcast_to(dash, (n,)))
+
+        # Throttle: accelerate along the input, decay the sideways part
+        mv = self.move_vel + direction * (self.traction_accel * dt)[:, None]
+        proj = np.einsum("ij,ij->i", mv, direction)[:, None] * direction
+        steered = proj + (mv - proj) * np.exp(-self.steer_align * dt)[:, None]
+        # Coasting: friction + drag, snapping to rest below the speed cut
+        speed = np.hypot(self.move_vel[:, 0], self.move_vel[:, 1])
+        new_speed = np.maximum(0.0, speed - (self.roll_friction + self.roll_drag * speed) * dt)
+        scale = np.where(new_speed <= self.min_speed_cut, 0.0,
+                         new_speed / np.where(speed > 0, speed, 1.0))
+        mv = np.where(held[:, None], steered, self.move_vel * scale[:, None])
+
+        base = np.hypot(mv[:, 0], mv[:, 1])
+        over = base > self.player_max_speed
+        mv[over] *= (self.player_max_speed[over] / base[over])[:, None]
+
+        self.dash_vel *= np.exp(-self.dash_decay * dt)[:, None]
+        transfer = np.minimum(self.dash_transfer * dt, 1.0)[:, None]
+        mv += self.dash_vel * transfer
+        self.dash_vel *= 1.0 - transfer
+        self.move_vel = mv
+
+        vel = mv + self.dash_vel
+        speed = np.hypot(vel[:, 0], vel[:, 1])
+        cap = np.where(speed > self.player_max_speed, self.dash_max_speed, self.player_max_speed)
+        over = speed > cap
+        vel[over] *= (cap[over] / speed[over])[:, None]
+        self.vel = vel
+        np.maximum(self.dash_cooldown - dt, 0.0, out=self.dash_cooldown)
+
+        self.pos += vel * dt
+        speed = np.hypot(vel[:, 0], vel[:, 1])
+        moving = speed > 1e-3
+        self.last_dir[moving] = vel[moving] / speed[moving, None]
+        return speed
+
+
+def measure(params: np.ndarray, dt: float = FIXED_DT) -> dict[str, np.ndarray]:
+    """Run the standard trace; NaN marks a threshold never reached.
+
+    - ``time_to_max``: s from rest until speed >= 95% of max speed
+    - ``turn_slip``: px drifted sideways during a 90 degree turn at speed
+    - ``turn_time``: s until the heading is within 10 degrees of the new input
+    - ``stop_distance`` / ``stop_time``: coasting from the end of the turn
+    """
+    batch = VehicleBatch(params)
+    n = batch.n
+    out = {k: np.full(n, np.nan) for k in ("time_to_max", "turn_time", "stop_time")}
+    out["turn_slip"] = np.zeros(n)
+    out["stop_distance"] = np.zeros(n)
+    cos_align = math.cos(math.radians(ALIGN_DEG))
+    for phase, seconds, direction in TRACE:
+        steps = int(round(seconds / dt))
+        for i in range(steps):
+            speed = batch.step(direction, dt)
+            t = (i + 1) * dt
+            if phase == "accelerate":
+                hit = np.isnan(out["time_to_max"]) & (speed >= TOP_SPEED_FRACTION * batch.player_max_speed)
+                out["time_to_max"][hit] = t
+            elif phase == "turn":
+                dx, dy = direction
+                out["turn_slip"] += np.abs(batch.vel[:, 0] * dy - batch.vel[:, 1] * dx) * dt
+                along = (batch.vel[:, 0] * dx + batch.vel[:, 1] * dy) / np.maximum(speed, 1e-9)
+                hit = np.isnan(out["turn_time"]) & (along >= cos_align)
+                out["turn_time"][hit] = t
+            else:
+                out["stop_distance"] += speed * dt
+                hit = np.isnan(out["stop_time"]) & (speed == 0.0)
+                out["stop_time"][hit] = t
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep grip presets and part multipliers.")
+    parser.add_argument("--presets", default="medium,mud,ice")
+    parser.add_argument("--mult", action="append", default=[], metavar="FIELD=M1,M2",
+                        help="multipliers for one SurfaceParams field (default: 11 steps over the part range "
+                             "for traction_accel, player_max_speed, steer_align)")
+    parser.add_argument("--out", help="write one CSV row per vehicle")
+    args = parser.parse_args()
+
+    from tables import Tables
+    tiles = Tables().tiles
+    presets = args.presets.split(",")
+    for name in presets:
+        if name not in tiles:
+            raise SystemExit(f"unknown preset {name!r}; have {sorted(tiles)}")
+    if args.mult:
+        axes = {}
+        for spec in args.mult:
+            field, _, values = spec.partition("=")
+            if field not in FIELDS:
+                raise SystemExit(f"unknown field {field!r}; have {FIELDS}")
+            axes[field] = [float(v) for v in values.split(",")]
+    else:
+        steps = np.linspace(*PART_MULT_RANGE, 11).round(2).tolist()
+        axes = {f: steps for f in ("traction_accel", "player_max_speed", "steer_align")}
+
+    combos = list(itertools.product(*axes.values()))
+    mult = np.ones((len(combos), len(FIELDS)))
+    for j, field in enumerate(axes):
+        mult[:, FIELDS.index(field)] = [c[j] for c in combos]
+    params = np.concatenate([part_params(tiles[name], mult) for name in presets])
+
+    start = time.perf_counter()
+    metrics = measure(params)
+    elapsed = time.perf_counter() - start
+    print(f"{len(params)} vehicles in {elapsed:.2f}s", file=sys.stderr)
+
+    names = list(metrics)
+    unscaled = np.flatnonzero((mult == 1.0).all(axis=1))
+    base = int(unscaled[0]) if len(unscaled) else None  # Row showing the plain preset
+    print(f"{'preset':8s} " + " ".join(f"{m:>22s}" for m in names))
+    for p, name in enumerate(presets):
+        rows = slice(p * len(combos), (p + 1) * len(combos))
+        cells = []
+        for m in names:
+            v = metrics[m][rows]
+            at_base = f"{v[base]:.3g}" if base is not None else "-"
+            cells.append(f"{at_base:>6s} [{np.nanmin(v):6.3g}..{np.nanmax(v):6.3g}]")
+        print(f"{name:8s} " + " ".join(f"{c:>22s}" for c in cells))
+
+    if args.out:
+        with open(args.out, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["preset", *(f"x_{a}" for a in axes), *names])
+            for p, name in enumerate(presets):
+                for k, combo in enumerate(combos):
+                    i = p * len(combos) + k
+                    w.writerow([name, *combo, *(f"{metrics[m][i]:.4f}" for m in names)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import csv
+import numpy as np
+
+# Order matters: simulation ticks report the first seven, the window adds draw
+PHASES = ("input", "player_physics", "enemies", "firing", "bullets", "collisions", "lock", "draw")
+DRAW = PHASES.index("draw")
+
+
+class PhaseTimer:
+    """Ring buffer of per-frame phase times (seconds), one row per frame.
+
+    Sub-steps run in the same frame add into that frame's row; `end_frame()`
+    moves on to the next row, overwriting the oldest once the buffer is full.
+    """
+
+    def __init__(self, frames: int = 240):
+        self.buf = np.zeros((frames, len(PHASES)))
+        self.frames = frames
+        self.index = 0
+        self.filled = 0
+
+    def add_tick(self, times):
+        row = self.buf[self.index]
+        for i, t in enumerate(times):
+            row[i] += t
+
+    def add(self, phase: int, seconds: float):
+        self.buf[self.index, phase] += seconds
+
+    def end_frame(self):
+        self.index = (self.index + 1) % self.frames
+        self.filled = min(self.filled + 1, self.frames)
+        self.buf[self.index] = 0.0
+
+    def _recent(self) -> np.ndarray:
+        """Completed frames (the row being filled is left out)."""
+        if self.filled < self.frames:
+            return self.buf[:self.filled]
+        return np.delete(self.buf, self.index, axis=0)
+
+    def averages(self) -> np.ndarray:
+        recent = self._recent()
+        return recent.mean(axis=0) if len(recent) else np.zeros(len(PHASES))
+
+    def worst(self) -> np.ndarray:
+        recent = self._recent()
+        return recent.max(axis=0) if len(recent) else np.zeros(len(PHASES))
+
+    def dump_csv(self, path: str):
+        """Write the buffered frames oldest-first, in milliseconds."""
+        if self.filled < self.frames:
+            rows = self.buf[:self.filled]
+        else:
+            rows = np.roll(self.buf, -(self.index + 1), axis=0)[:-1]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", *(f"{p}_ms" for p in PHASES), "total_ms"])
+            for i, row in enumerate(rows * 1000.0):
+                writer.writerow([i, *(f"{v:.4f}" for v in row), f"{row.sum():.4f}"])
@@ -0,0 +1,335 @@
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+from spatial import SpatialGrid
+from tables import WeaponStats
+
+OWNER_PLAYER = 0
+OWNER_ENEMY = 1
+
+BULLET_HALF = 3.0  # 6x6 bullet
+
+
+class Impacts(NamedTuple):
+    """Projectiles that stopped this tick, one row each."""
+    target: np.ndarray  # Target index hit, or -1 (wall or out of range)
+    pos: np.ndarray  # (k, 2) point where it stopped
+    kind: np.ndarray  # `Ballistics` row
+    damage: np.ndarray  # Base damage before falloff
+    travelled: np.ndarray  # px flown, including this tick's part
+
+    @classmethod
+    def none(cls) -> "Impacts":
+        return cls(np.zeros(0, dtype=np.intp), np.zeros((0, 2)), np.zeros(0, dtype=np.int16),
+                   np.zeros(0), np.zeros(0))
+
+    def merge(self, other: "Impacts") -> "Impacts":
+        if len(other.target) == 0:
+            return self
+        if len(self.target) == 0:
+            return other
+        return Impacts(*(np.concatenate(pair) for pair in zip(self, other)))
+
+
+class Ballistics:
+    """Falloff, splash and status factors per shot kind, one kind per (weapon, quality).
+
+    Projectiles carry only a kind id; impacts look the factors up here in
+    bulk, so damage rules live in ``weapons.json`` rather than on shots.
+    Missiles get kinds too, keyed ``("missile", name)``, after the weapons.
+    """
+
+    def __init__(self, weapons: dict, missiles: dict | None = None):
+        keys = [(w, q) for w, qualities in weapons.items() for q in qualities]
+        rows = [weapons[w][q] for w, q in keys]
+        for name, stats in (missiles or {}).items():
+            keys.append(("missile", name))
+            rows.append(stats)
+        self.kinds = {key: i for i, key in enumerate(keys)}
+        defaults = WeaponStats._field_defaults
+
+        def column(field):
+            return np.array([getattr(r, field, defaults[field]) for r in rows], dtype=float)
+
+        end = column("falloff_end")
+        self.max_range = np.where(end > 0, end, np.inf)
+        self.falloff_start = np.minimum(column("falloff_start"), self.max_range)
+        self.falloff_min = column("falloff_min")
+        self.splash_radius = column("splash_radius")
+        self.splash_damage = column("splash_damage")
+        self.splash_min = column("splash_min")
+        self.pierce = column("pierce")
+        self.burn_dps = column("burn_dps")
+        self.burn_time = column("burn_time")
+
+    def falloff(self, kind: np.ndarray, travelled: np.ndarray) -> np.ndarray:
+        """Damage multiplier: 1 up to falloff_start, linear to falloff_min at max range."""
+        start, end = self.falloff_start[kind], self.max_range[kind]
+        span = np.where(np.isfinite(end), end - start, np.inf)
+        frac = np.clip((travelled - start) / np.maximum(span, 1e-9), 0.0, 1.0)
+        return 1.0 - (1.0 - self.falloff_min[kind]) * frac
+
+    def splash(self, kind: int, dist: np.ndarray) -> np.ndarray:
+        """Splash damage at ``dist`` px from the impact (within the radius)."""
+        frac = dist / self.splash_radius[kind]
+        return self.splash_damage[kind] * (1.0 - (1.0 - self.splash_min[kind]) * frac)
+
+
+def fan(spread_deg: float, count: int) -> np.ndarray:
+    """Angle offsets (radians) for ``count`` shots evenly across the spread."""
+    half = math.radians(spread_deg) / 2
+    return np.linspace(-half, half, count) if count > 1 else np.zeros(1)
+
+
+class ProjectilePool:
+    """Preallocated projectile storage with a free list.
+
+    Slots are recycled instead of allocating a sprite per shot; `active`
+    marks the live ones. Grows by doubling only when every slot is in use.
+    """
+
+    COLUMNS = ("pos", "vel", "damage", "owner", "kind", "travelled", "active")
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = 0
+        self.pos = np.zeros((0, 2))
+        self.vel = np.zeros((0, 2))
+        self.damage = np.zeros(0)
+        self.owner = np.zeros(0, dtype=np.int8)
+        self.kind = np.zeros(0, dtype=np.int16)  # `Ballistics` row
+        self.travelled = np.zeros(0)  # px flown so far
+        self.active = np.zeros(0, dtype=bool)
+        self._free: list[int] = []
+        self._grow(capacity)
+
+    def _grow(self, capacity: int):
+        old = self.capacity
+        for name in self.COLUMNS:
+            arr = getattr(self, name)
+            new = np.zeros((capacity,) + arr.shape[1:], dtype=arr.dtype)
+            new[:old] = arr
+            setattr(self, name, new)
+        # Pop order hands out low slots first
+        self._free.extend(range(capacity - 1, old - 1, -1))
+        self.capacity = capacity
+
+    def spawn(self, x: float, y: float, vx: float, vy: float,
+              damage: float, owner: int = OWNER_PLAYER, kind: int = 0) -> int:
+        if not self._free:
+            self._grow(self.capacity * 2)
+        i = self._free.pop()
+        self.pos[i] = (x, y)
+        self.vel[i] = (vx, vy)
+        self.damage[i] = damage
+        self.owner[i] = owner
+        self.kind[i] = kind
+        self.travelled[i] = 0.0
+        self.active[i] = True
+        return i
+
+    def spawn_many(self, pos, vel: np.ndarray, damage: float,
+                   owner: int = OWNER_PLAYER, kind: int = 0) -> np.ndarray:
+        """Spawn one projectile per row of ``vel`` (a volley) in one batch.
+
+        ``pos`` is one shared (x, y) or a row per projectile. Returns the slots.
+        """
+        k = len(vel)
+        while len(self._free) < k:
+            self._grow(self.capacity * 2)
+        slots = np.array(self._free[:-k - 1:-1], dtype=np.intp)  # Same order as k pops
+        del self._free[-k:]
+        self.pos[slots] = pos
+        self.vel[slots] = vel
+        self.damage[slots] = damage
+        self.owner[slots] = owner
+        self.kind[slots] = kind
+        self.travelled[slots] = 0.0
+        self.active[slots] = True
+        return slots
+
+    def release(self, i: int):
+        if self.active[i]:
+            self.active[i] = False
+            self._free.append(i)
+
+    def clear(self):
+        """Release every slot, handing them out in the same order as a fresh pool."""
+        self.active[:] = False
+        self._free = list(range(self.capacity - 1, -1, -1))
+
+    def remap_kinds(self, remap: np.ndarray):
+        """Follow a `Ballistics` rebuild: kind ``k`` becomes ``remap[k]``; -1 drops the shot."""
+        idx = np.flatnonzero(self.active)
+        kind = remap[self.kind[idx]]
+        self.kind[idx] = np.maximum(kind, 0)
+        for i in idx[kind < 0].tolist():
+            self.release(i)
+
+    def __len__(self) -> int:
+        return self.capacity - len(self._free)
+
+    def positions(self) -> np.ndarray:
+        return self.pos[self.active]
+
+    def advance(self, dt: float, grid, targets: SpatialGrid, target_half: float,
+                max_range: np.ndarray | None = None) -> Impacts:
+        """Move every live projectile, sweeping against walls and targets.
+
+        Player-owned projectiles are tested against the points of the
+        ``targets`` index (centres of square boxes with half-size
+        ``target_half``), only those in cells their path this tick crosses.
+        A projectile stops at whichever it reaches first: a target, a wall,
+        or the end of its range (``max_range`` indexed by kind). Returns the
+        `Impacts` of every projectile that stopped.
+        """
+        idx = np.nonzero(self.active)[0]
+        if len(idx) == 0:
+            return Impacts.none()
+        p0 = self.pos[idx]
+        step = self.vel[idx] * dt
+        p1 = p0 + step
+        t_wall = grid.sweep_segments(p0, p1)
+        length = np.hypot(step[:, 0], step[:, 1])
+        if max_range is not None:
+            left = max_range[self.kind[idx]] - self.travelled[idx]
+            out = length > left
+            t_wall[out] = np.minimum(t_wall[out], left[out] / length[out])
+
+        t_hit = np.full(len(idx), np.inf)
+        target = np.full(len(idx), -1, dtype=np.intp)
+        shooters = self.owner[idx] == OWNER_PLAYER
+        if len(targets.pos) and shooters.any():
+            rows = np.nonzero(shooters)[0]
+            half = target_half + BULLET_HALF
+            a, b = p0[rows], p1[rows]
+            seg, cand = targets.query_boxes(np.minimum(a, b) - half, np.maximum(a, b) + half)
+            t_enter = segment_box_entry(a[seg], b[seg], targets.pos[cand], half)
+            hit = np.isfinite(t_enter)
+            seg, cand, t_enter = seg[hit], cand[hit], t_enter[hit]
+            # Earliest entry per segment, lowest target index on ties
+            order = np.lexsort((cand, t_enter, seg))
+            seg, first = np.unique(seg[order], return_index=True)
+            t_hit[rows[seg]] = t_enter[order[first]]
+            target[rows[seg]] = cand[order[first]]
+
+        hit_target = np.isfinite(t_hit) & (t_hit <= t_wall)
+        stopped = hit_target | np.isfinite(t_wall)
+        self.pos[idx] = p1
+        self.travelled[idx] += length
+        if not stopped.any():
+            return Impacts.none()
+        t_stop = np.where(hit_target, t_hit, t_wall)[stopped]
+        gone = idx[stopped]
+        self.active[gone] = False
+        self._free.extend(gone.tolist())
+        travelled = self.travelled[gone] - length[stopped] * (1.0 - t_stop)
+        return Impacts(np.where(hit_target, target, -1)[stopped],
+                       p0[stopped] + step[stopped] * t_stop[:, None],
+                       self.kind[gone], self.damage[gone], travelled)
+
+
+
+class MissilePool(ProjectilePool):
+    """Homing projectiles with turn-rate-limited steering.
+
+    ``target`` is an `EnemyState` row (-1: none); the owner keeps it valid
+    across swap-removes with `retarget_removed`. `steer()` turns every live
+    missile toward its target in one vectorized pass. Missiles that lost
+    their target fly straight until `reacquire()` gives them the nearest
+    enemy from the shared spatial index; that runs at most every
+    ``reacquire_interval`` s for at most ``reacquire_budget`` missiles, so
+    a large salvo costs a bounded number of index queries per tick.
+    """
+
+    COLUMNS = ProjectilePool.COLUMNS + ("target", "heading", "speed", "turn_rate", "life")
+
+    def __init__(self, capacity: int = 32, reacquire_interval: float = 0.1,
+                 reacquire_budget: int = 8):
+        self.target = np.zeros(0, dtype=np.intp)
+        self.heading = np.zeros(0)  # rad
+        self.speed = np.zeros(0)
+        self.turn_rate = np.zeros(0)  # rad/s
+        self.life = np.zeros(0)  # s left
+        super().__init__(capacity)
+        self.reacquire_interval = reacquire_interval
+        self.reacquire_budget = reacquire_budget
+        self._reacquire_timer = 0.0
+
+    def clear(self):
+        super().clear()
+        self._reacquire_timer = 0.0
+
+    def launch(self, x: float, y: float, headings: np.ndarray, speed: float, turn_rate: float,
+               lifetime: float, damage: float, target: int = -1,
+               owner: int = OWNER_PLAYER, kind: int = 0) -> np.ndarray:
+        """Spawn a salvo, one missile per heading (rad); ``turn_rate`` in rad/s."""
+        vel = np.column_stack((np.cos(headings), np.sin(headings))) * speed
+        slots = self.spawn_many((x, y), vel, damage, owner, kind)
+        self.heading[slots] = headings
+        self.speed[slots] = speed
+        self.turn_rate[slots] = turn_rate
+        self.life[slots] = lifetime
+        self.target[slots] = target
+        return slots
+
+    def steer(self, dt: float, targets: np.ndarray):
+        """Expire spent missiles, then turn the rest toward ``targets[target]``."""
+        idx = np.flatnonzero(self.active)
+        if len(idx) == 0:
+            return
+        self.life[idx] -= dt
+        spent = self.life[idx] <= 0
+        if spent.any():
+            gone = idx[spent]
+            self.active[gone] = False
+            self._free.extend(gone.tolist())
+            idx = idx[~spent]
+        rows = idx[self.target[idx] >= 0]
+        if len(rows) == 0:
+            return
+        d = targets[self.target[rows]] - self.pos[rows]
+        turn = np.arctan2(d[:, 1], d[:, 0]) - self.heading[rows]
+        turn = (turn + np.pi) % (2 * np.pi) - np.pi
+        limit = self.turn_rate[rows] * dt
+        heading = self.heading[rows] + np.clip(turn, -limit, limit)
+        self.heading[rows] = heading
+        self.vel[rows, 0] = np.cos(heading) * self.speed[rows]
+        self.vel[rows, 1] = np.sin(heading) * self.speed[rows]
+
+    def reacquire(self, dt: float, index):
+        """Point a budgeted batch of targetless missiles at their nearest enemy."""
+        self._reacquire_timer -= dt
+        if self._reacquire_timer > 0:
+            return
+        self._reacquire_timer = self.reacquire_interval
+        lost = np.flatnonzero(self.active & (self.target < 0) & (self.owner == OWNER_PLAYER))
+        for i in lost[:self.reacquire_budget].tolist():
+            x, y = self.pos[i]
+            self.target[i] = index.nearest(x, y)[0]
+
+    def retarget_removed(self, row: int, last: int):
+        """Follow `EnemyState.remove(row)`: ``row`` is gone and ``last`` moved into it."""
+        target = self.target
+        target[target == row] = -1
+        if last != row:
+            target[target == last] = row
+
+
+def segment_box_entry(p0: np.ndarray, p1: np.ndarray, centers: np.ndarray, half: float) -> np.ndarray:
+    """Entry parameter of segment ``i`` into square box ``i`` (slab test).
+
+    Rows pair up one to one. Returns t in [0, 1], or inf for a miss.
+    Segments starting inside their box report t = 0.
+    """
+    d = p1 - p0
+    d = np.where(np.abs(d) < 1e-12, 1e-12, d)
+    rel = centers - p0
+    inv = 1.0 / d
+    t_a = (rel - half) * inv
+    t_b = (rel + half) * inv
+    t_enter = np.minimum(t_a, t_b).max(axis=1)
+    t_exit = np.maximum(t_a, t_b).min(axis=1)
+    hit = (t_enter <= t_exit) & (t_exit >= 0.0) & (t_enter <= 1.0)
+    return np.where(hit, np.maximum(t_enter, 0.0), np.inf)
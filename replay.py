@@ -0,0 +1,169 @@
+"""Input recording and headless max-speed replay.
+
+A recording is a JSON-lines file: a header with the run seed and starting
+loadout, then one ``[tick, {field: value}]`` entry per tick whose input
+changed. Held keys are stored only when they change; one-shot commands are
+stored on the tick they fire. Replaying rebuilds the same `Simulation` from
+the seed and loadout and feeds the inputs back tick by tick, as fast as the
+CPU allows.
+
+    python replay.py run.replay [--profile]
+    python replay.py --check-reset SEED
+"""
+import argparse
+import hashlib
+import json
+import time
+from dataclasses import fields
+
+from simulation import InputState, Simulation
+
+FORMAT = 10  # Header {format, seed, loadout, ticks}, then [tick, changes] lines; bump when replays diverge
+_HELD = ("left", "right", "up", "down", "fire")
+_COMMANDS = tuple(f.name for f in fields(InputState) if f.name not in _HELD)
+
+
+class InputRecorder:
+    """Collects the per-tick inputs of one run (attach as `Simulation.recorder`)."""
+
+    def __init__(self, seed: int, loadout: dict[str, str] | None = None):
+        self.seed = seed
+        self.loadout = loadout  # `Simulation.loadout` at tick 0; None for the defaults
+        self.events: list[tuple[int, dict]] = []
+        self.ticks = 0
+        self._held = InputState()
+
+    def record(self, tick: int, inputs: InputState):
+        change = {}
+        for name in _HELD:
+            value = getattr(inputs, name)
+            if value != getattr(self._held, name):
+                change[name] = value
+                setattr(self._held, name, value)
+        for name in _COMMANDS:
+            value = getattr(inputs, name)
+            if value:
+                change[name] = value
+        if change:
+            self.events.append((tick, change))
+        self.ticks = tick + 1
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            header = {"format": FORMAT, "seed": self.seed, "loadout": self.loadout, "ticks": self.ticks}
+            f.write(json.dumps(header) + "\n")
+            for tick, change in self.events:
+                f.write(json.dumps([tick, change]) + "\n")
+
+
+def load(path: str) -> tuple[dict, list[tuple[int, dict]]]:
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != FORMAT:
+            raise ValueError(f"unsupported replay format: {header.get('format')!r}")
+        events = [(tick, change) for tick, change in map(json.loads, f)]
+    return header, events
+
+
+def playback(events: list[tuple[int, dict]], ticks: int):
+    """Yield the InputState for each tick in ``range(ticks)``."""
+    held = InputState()
+    pending = iter(events)
+    nxt = next(pending, None)
+    for tick in range(ticks):
+        inputs = held.held()
+        while nxt is not None and nxt[0] == tick:
+            for name, value in nxt[1].items():
+                setattr(inputs, name, value)
+                if name in _HELD:
+                    setattr(held, name, value)
+            nxt = next(pending, None)
+        yield inputs
+
+
+def digest(sim: Simulation) -> str:
+    """Short hash of the gameplay state, for checking two runs match."""
+    h = hashlib.sha1()
+    h.update(repr((sim.tick, sim.player.center_x, sim.player.center_y,
+                   sim.kill_count, sim.ammo_in_mag)).encode())
+    h.update(sim.enemies.pos[:sim.enemies.count].tobytes())
+    h.update(sim.enemies.hp[:sim.enemies.count].tobytes())
+    for pool in (sim.projectiles, sim.missiles):
+        h.update(pool.pos[pool.active].tobytes())
+    return h.hexdigest()[:16]
+
+
+def replay(path: str, ticks: int | None = None) -> Simulation:
+    header, events = load(path)
+    sim = Simulation(seed=header["seed"])
+    if header["loadout"] is not None:
+        sim.set_loadout(**header["loadout"])
+    for inputs in playback(events, header["ticks"] if ticks is None else ticks):
+        sim.step(inputs)
+    return sim
+
+
+def _reset_script(tick: int) -> InputState:
+    return InputState(fire=True, missile=tick % 40 == 0, weapon="rocket" if tick == 0 else None,
+                      left=(tick // 200) % 2 == 0, up=(tick // 330) % 2 == 0)
+
+
+def check_reset(seed: int, ticks: int = 2400) -> int | None:
+    """First tick where a `reset_round` sim differs from a fresh one, or None.
+
+    Plays a scripted rocket and missile run until missiles are in flight,
+    resets into ``seed + 1``, then steps it beside a fresh `Simulation` on
+    that seed (same loadout and inputs), comparing `digest` every tick.
+    """
+    sim = Simulation(seed=seed, enemy_count=20)
+    tick = 0
+    while not len(sim.missiles):
+        if tick == 10_000:
+            raise RuntimeError(f"check_reset: seed {seed} never had missiles in flight")
+        sim.step(_reset_script(tick))
+        tick += 1
+    sim.reset_round(seed + 1)
+    fresh = Simulation(seed=seed + 1, enemy_count=20)
+    fresh.set_loadout(**sim.loadout)
+    for tick in range(ticks):
+        inputs = _reset_script(tick + 1)
+        sim.step(inputs)
+        fresh.step(inputs)
+        if digest(sim) != digest(fresh):
+            return tick
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded run headless at full speed.")
+    parser.add_argument("path", nargs="?")
+    parser.add_argument("--check-reset", type=int, metavar="SEED",
+                        help="check that reset_round matches a fresh Simulation, then exit")
+    parser.add_argument("--ticks", type=int, help="stop after this many ticks")
+    parser.add_argument("--profile", action="store_true", help="run under cProfile")
+    args = parser.parse_args()
+    if args.check_reset is not None:
+        tick = check_reset(args.check_reset)
+        print("reset round matches a fresh one" if tick is None else f"reset round diverged at tick {tick}")
+        raise SystemExit(tick is not None)
+    if args.path is None:
+        parser.error("path is required")
+
+    if args.profile:
+        import cProfile
+        import pstats
+        prof = cProfile.Profile()
+        start = time.perf_counter()
+        sim = prof.runcall(replay, args.path, args.ticks)
+        elapsed = time.perf_counter() - start
+        pstats.Stats(prof).sort_stats("cumulative").print_stats(25)
+    else:
+        start = time.perf_counter()
+        sim = replay(args.path, args.ticks)
+        elapsed = time.perf_counter() - start
+    print(f"ticks={sim.tick} time={elapsed:.3f}s ({sim.tick / max(elapsed, 1e-9):.0f} ticks/s) "
+          f"kills={sim.kill_count} digest={digest(sim)}")
+
+
+if __name__ == "__main__":
+    main()
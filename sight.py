@@ -0,0 +1,66 @@
+import math
+
+import numpy as np
+
+UNKNOWN, BLOCKED, CLEAR = -1, 0, 1
+
+
+class LineOfSight:
+    """Tile-to-tile line of sight over a `TileGrid`, memoized per tile pair.
+
+    A ray runs from the centre of the source tile to the centre of the
+    target tile through the grid DDA (`TileGrid.sweep_segment(s)`, nothing
+    tunnels). Answers are kept in a dense ``[target, source]`` table of flat
+    tile indices, so a repeat query is one read: `clear()` for one pair, or
+    `visible()` for a whole crowd with one gather plus one batched sweep
+    for the source tiles not seen yet. The table is wiped only when
+    ``grid.version`` changes.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        tiles = grid.cols * grid.rows
+        self.memo = np.full((tiles, tiles), UNKNOWN, dtype=np.int8)
+        self.version = grid.version
+        t = grid.tile
+        rows, cols = np.divmod(np.arange(tiles), grid.cols)
+        self._centres = np.column_stack(((cols + 0.5) * t, (rows + 0.5) * t))
+
+    def _sync(self):
+        if self.version != self.grid.version:
+            self.memo.fill(UNKNOWN)
+            self.version = self.grid.version
+
+    def _cells(self, pos: np.ndarray) -> np.ndarray:
+        r, c = self.grid.tiles_of(pos)
+        return r * self.grid.cols + c
+
+    def _cell(self, x: float, y: float) -> int:
+        g = self.grid
+        c = min(max(int(x // g.tile), 0), g.cols - 1)
+        r = min(max(int(y // g.tile), 0), g.rows - 1)
+        return r * g.cols + c
+
+    def visible(self, sources: np.ndarray, target: tuple[float, float]) -> np.ndarray:
+        """Whether each (x, y) row of ``sources`` has line of sight to ``target``."""
+        self._sync()
+        src = self._cells(sources)
+        dst = self._cell(*target)
+        row = self.memo[dst]
+        todo = np.unique(src[row[src] == UNKNOWN])
+        if len(todo):
+            p1 = np.broadcast_to(self._centres[dst], (len(todo), 2))
+            hit = self.grid.sweep_segments(self._centres[todo], p1)
+            row[todo] = np.where(np.isinf(hit), CLEAR, BLOCKED)
+        return row[src] == CLEAR
+
+    def clear(self, x0: float, y0: float, x1: float, y1: float) -> bool:
+        """Line of sight from the tile under (x0, y0) to the tile under (x1, y1)."""
+        self._sync()
+        src, dst = self._cell(x0, y0), self._cell(x1, y1)
+        known = self.memo[dst, src]
+        if known == UNKNOWN:
+            (ax, ay), (bx, by) = self._centres[src], self._centres[dst]
+            hit = self.grid.sweep_segment(float(ax), float(ay), float(bx), float(by))
+            known = self.memo[dst, src] = CLEAR if math.isinf(hit) else BLOCKED
+        return bool(known == CLEAR)
@@ -0,0 +1,869 @@
+import math
+import random
+import time
+import numpy as np
+from dataclasses import dataclass, replace
+from typing import Callable
+
+import levelgen
+from damage import CombatTick, DamageSystem
+from enemies import EnemyState
+from flowfield import FlowField
+from projectiles import Ballistics, Impacts, MissilePool, ProjectilePool, fan
+from sight import LineOfSight
+from spatial import SpatialGrid
+from spawns import SpawnSampler
+from surfaces import SurfaceMap
+from tables import Tables
+from tilegrid import TileGrid
+from waves import WaveScheduler
+
+# --- Core constants ---
+TILE = 40
+COLS, ROWS = 48, 27  # 48*40=1920, 27*40=1080
+SCREEN_W, SCREEN_H = COLS * TILE, ROWS * TILE  # 1920x1080
+PLAYER_HALF = (TILE - 8) / 2  # Matches the shrunken player hit box
+ENEMY_HALF = TILE / 2
+ENEMY_BODY_HALF = (TILE - 8) / 2  # Wall-collision box; full size fits no 1-tile gap
+
+# --- Fixed timestep ---
+FIXED_DT = 1 / 120
+MAX_STEPS_PER_FRAME = 8  # Drop time instead of spiralling when a frame stalls
+
+# Default floor patches (terrain name -> share of the floor); {} for a plain arena
+TERRAIN_MIX = {"mud": 0.08, "ice": 0.08}
+
+
+
+class Player:
+    """Player body. Only the centre lives here; the window draws it."""
+
+    def __init__(self, x: float, y: float):
+        self.center_x = x
+        self.center_y = y
+
+    @property
+    def position(self) -> tuple[float, float]:
+        return self.center_x, self.center_y
+
+    @position.setter
+    def position(self, xy: tuple[float, float]):
+        self.center_x, self.center_y = xy
+
+
+class Enemy:
+    """Stable handle to one row in `EnemyState` (survives swap-removes)."""
+
+    def __init__(self):
+        self.state: EnemyState | None = None
+        self.slot = -1
+
+    @property
+    def center_x(self) -> float:
+        return float(self.state.pos[self.slot, 0])
+
+    @property
+    def center_y(self) -> float:
+        return float(self.state.pos[self.slot, 1])
+
+    @property
+    def hp(self) -> float:
+        return float(self.state.hp[self.slot]) if self.state is not None else 0.0
+
+    @property
+    def alive(self) -> bool:
+        return self.state is not None and bool(self.state.alive[self.slot])
+
+
+@dataclass
+class InputState:
+    """Player input for one tick. Held keys persist, commands fire once."""
+    left: bool = False
+    right: bool = False
+    up: bool = False
+    down: bool = False
+    fire: bool = False
+    # One-shot commands (key presses)
+    dash: bool = False
+    reload: bool = False
+    missile: bool = False
+    weapon: str | None = None
+    quality: str | None = None
+    grip: str | None = None
+
+    def held(self) -> "InputState":
+        """Copy with the one-shot commands cleared (for extra sub-steps)."""
+        return replace(self, dash=False, reload=False, missile=False, weapon=None, quality=None, grip=None)
+
+
+@dataclass
+class EnemyDeath:
+    tick: int
+    x: float
+    y: float
+    kind: str = ""
+    lifetime: float = 0.0  # s from spawn to death
+
+
+class Simulation:
+    """Window-free game state. `step()` advances one fixed tick.
+
+    Never imports arcade, so headless tools stay cheap to start. The level
+    and the opening enemies are built by `start()`, which the first `step()`
+    calls if nobody did earlier. With ``enemy_count=None`` rounds come from
+    the wave table (see `WaveScheduler`); a number spawns one fixed batch.
+    """
+
+    def __init__(self, seed: int | None = None, obstacle_density: float = 0.03,
+                 enemy_count: int | None = None, tables: Tables | None = None,
+                 terrain_mix: dict[str, float] | None = None):
+        # Design data (weapons, surfaces, enemy templates)
+        self.tables = tables if tables is not None else Tables()
+        self.enemy_kinds = list(self.tables.enemies)  # EnemyState.kind -> template name
+
+        # Per-run RNG: every random choice in level build and spawning uses it
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        # Optional per-tick input sink (see replay.InputRecorder)
+        self.recorder = None
+        # Optional per-phase timing sink (see profiling.PhaseTimer)
+        self.timer = None
+
+        self.enemies = EnemyState()
+        # Queued hits, armor and status effects, applied once per tick
+        self.damage = DamageSystem(self.enemies, FIXED_DT)
+        self._spare_enemies: list[Enemy] = []  # Recycled handles
+        # Shared proximity index over enemy positions, rebuilt lazily
+        self.enemy_index = SpatialGrid(SCREEN_W, SCREEN_H, 4 * TILE)
+        self._enemy_index_dirty = True
+        self.projectiles = ProjectilePool()
+
+        self.player = Player(SCREEN_W // 2, SCREEN_H // 2)
+
+        # Wall occupancy grid, also used for collision
+        self.grid = TileGrid(COLS, ROWS, TILE)
+        self.obstacle_density = obstacle_density  # Obstacle placement attempts per tile
+        self.terrain_mix = TERRAIN_MIX if terrain_mix is None else terrain_mix
+        self.level: levelgen.Level | None = None
+        # Terrain layer + per-terrain surface parameters (see apply_grip_preset)
+        self.surfaces = SurfaceMap(COLS, ROWS, TILE)
+        self.surface_id = -1  # Terrain id the player's movement params come from
+        # Shared chase field toward the player's tile
+        self.flow = FlowField(self.grid)
+        # Spawn-point picker over an incrementally kept free-cell index
+        self.spawns = SpawnSampler(self.grid, self.flow)
+        # Memoized tile-to-tile line of sight (lock-on, ranged shooters)
+        self.sight = LineOfSight(self.grid)
+        self.spawn_safe_radius = 5 * TILE  # px, straight line from the player
+        self.spawn_min_steps = 0  # Tiles of walking distance from the player
+        self.spawn_spread = 1  # Min tiles between points in one batch
+
+        # --- Weapon: mg / shotgun / rocket (white/green/purple) ---
+        self.ballistics = Ballistics(self.tables.weapons, self.tables.missiles)  # Falloff + splash per shot kind
+        self.weapon = "mg"
+        self.weapon_quality: str = "white"
+        self.weapon_stats = self.tables.weapons[self.weapon]
+        self.fire_cd = 0.0
+        self.reloading = False
+        self.reload_timer = 0.0
+        self.ammo_in_mag = 0
+        self.set_quality(self.weapon_quality)
+        self.ammo_in_mag = self.mag_size
+
+        # --- Homing missile skill (lock, windup, salvo) ---
+        self.missiles = MissilePool()
+        self.missile_stats = self.tables.missiles["player"]
+        self.missile_cd = 0.0
+        self.missile_windup = 0.0  # s left until the salvo leaves (0: idle)
+        self._missile_target: Enemy | None = None
+
+        # --- Movement physics params ---
+        self.player_vel_x = 0.0
+        self.player_vel_y = 0.0
+        self.move_vel_x = 0.0
+        self.move_vel_y = 0.0
+        self.dash_vel_x = 0.0
+        self.dash_vel_y = 0.0
+        self.apply_grip_preset("medium")
+
+        # --- Dash ---
+        self.dash_cooldown = 0.0
+        self.dash_cd_max = 3.0
+        self.dash_impulse = 900.0
+        self.dash_max_speed = 700.0
+
+        # --- Target lock & facing ---
+        self.lock_target: Enemy | None = None
+        self.lock_reacquire_interval = 0.1  # s between nearest-enemy searches
+        self.lock_switch_margin = TILE  # New target must be this much closer (px)
+        self._lock_timer = 0.0
+        self.last_move_dir: tuple[float, float] = (1.0, 0.0)
+
+        # Round state
+        self.round_active = True
+        self.round_message = ""
+        self.kill_count = 0
+        # Combat stats for balance runs
+        self.shots_fired = 0
+        self.shots_hit = 0
+        self.damage_taken = 0.0
+        # Called with an EnemyDeath for every kill (scoring/rewards)
+        self.on_enemy_death: list[Callable[[EnemyDeath], None]] = []
+        # Called with each tick's CombatTick when anything took damage
+        self.on_damage: list[Callable[[CombatTick], None]] = []
+
+        # --- Clock ---
+        self.tick = 0
+        self.time = 0.0
+        self._accumulator = 0.0
+
+        # Level + opening spawns are deferred to start()
+        self.started = False
+        self._initial_enemies = enemy_count
+        self.waves = WaveScheduler(self) if enemy_count is None else None
+        self.startup_times: dict[str, float] = {}
+
+    def start(self):
+        """Build the level and spawn the opening enemies (idempotent)."""
+        if self.started:
+            return
+        self.started = True
+        clock = time.perf_counter
+        t0 = clock()
+        self._build_level()
+        t1 = clock()
+        if self.waves is not None:
+            self.waves.begin()
+        else:
+            self._spawn_enemies(self._initial_enemies)
+        self.startup_times["build_level"] = t1 - t0
+        self.startup_times["spawn_enemies"] = clock() - t1
+
+    def reset_round(self, seed: int | None = None, config: dict | None = None):
+        """Start a fresh round in place, reusing every object and buffer.
+
+        Only the tile grid and entity state are rewritten: enemy handles go
+        back to the spare pool, projectile slots are released, the player is
+        re-centred, and the level is regenerated by the next `start()`.
+        The `loadout` (weapon, quality, grip) carries over. ``config`` may override
+        ``obstacle_density``, ``enemy_count`` and ``terrain_mix``.
+        """
+        config = config or {}
+        unknown = set(config) - {"obstacle_density", "enemy_count", "terrain_mix"}
+        if unknown:
+            raise ValueError(f"reset_round: unknown config keys {sorted(unknown)}")
+        self.obstacle_density = config.get("obstacle_density", self.obstacle_density)
+        if "terrain_mix" in config:
+            mix = config["terrain_mix"]
+            self.terrain_mix = TERRAIN_MIX if mix is None else mix
+        if "enemy_count" in config:
+            self._initial_enemies = config["enemy_count"]
+            if self._initial_enemies is None:
+                self.waves = self.waves or WaveScheduler(self)
+            else:
+                self.waves = None
+        if self.waves is not None:
+            self.waves.reset()
+
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng.seed(self.seed)
+
+        self._spare_enemies.extend(self.enemies.clear())
+        self._enemy_index_dirty = True
+        self.projectiles.clear()
+        self.missiles.clear()
+        self.damage.clear()
+        self.missile_cd = 0.0
+        self.missile_windup = 0.0
+        self._missile_target = None
+
+        self.player.position = (SCREEN_W // 2, SCREEN_H // 2)
+        self.player_vel_x = self.player_vel_y = 0.0
+        self.move_vel_x = self.move_vel_y = 0.0
+        self.dash_vel_x = self.dash_vel_y = 0.0
+        self.dash_cooldown = 0.0
+        self.fire_cd = 0.0
+        self.reloading = False
+        self.reload_timer = 0.0
+        self.ammo_in_mag = self.mag_size
+        self.lock_target = None
+        self._lock_timer = 0.0
+        self.last_move_dir = (1.0, 0.0)
+
+        self.round_active = True
+        self.round_message = ""
+        self.kill_count = 0
+        self.shots_fired = 0
+        self.shots_hit = 0
+        self.damage_taken = 0.0
+        self.tick = 0
+        self.time = 0.0
+        self._accumulator = 0.0
+        self.started = False
+
+    def _build_level(self):
+        self.level = levelgen.generate(
+            self.rng.getrandbits(32), COLS, ROWS, self.obstacle_density, self.terrain_mix,
+            start=self.grid.tile_of(self.player.center_x, self.player.center_y),
+        )
+        self.grid.load(self.level.solid)
+        self._load_surfaces(self.level.terrain)
+
+    def apply_grip_preset(self, mode: str):
+        """Set the base floor's movement preset (grip/inertia + dash behavior).
+
+        Mud and ice patches painted by the level keep their own presets.
+        """
+        if mode not in self.tables.tiles:
+            mode = "medium"
+        self.grip_mode = mode
+        self._load_surfaces()
+
+    def _load_surfaces(self, terrain: np.ndarray | None = None):
+        patches = self.level.terrains[1:] if self.level is not None else ()
+        self.surfaces.load(self.tables.tiles, (self.grip_mode, *patches), terrain)
+        self._set_surface(self.surfaces.at(self.player.center_x, self.player.center_y))
+
+    def _set_surface(self, terrain_id: int):
+        """Copy one terrain's movement params onto the player (no allocation)."""
+        p = self.surfaces.records[terrain_id]
+        self.player_max_speed = p.player_max_speed
+        self.traction_accel = p.traction_accel
+        self.roll_friction = p.roll_friction
+        self.roll_drag = p.roll_drag
+        self.steer_align = p.steer_align
+        self.min_speed_cut = p.min_speed_cut
+        self.dash_decay = p.dash_decay
+        self.dash_transfer = p.dash_transfer
+        self.surface_id = terrain_id
+        self.surface_name = self.surfaces.names[terrain_id]
+
+    @property
+    def surface_cfg(self) -> dict[str, float]:
+        """Movement params of the surface under the player (debug HUD)."""
+        return self.surfaces.records[self.surface_id]._asdict()
+    def _spawn_enemies(self, count: int):
+        if count <= 0:
+            return
+        points = self.spawns.sample(
+            count, self.rng, (self.player.center_x, self.player.center_y),
+            self.spawn_safe_radius, self.spawn_min_steps, self.spawn_spread,
+        )
+        for x, y in points:
+            self.spawn_enemy(x, y)
+
+    def prewarm_enemies(self, count: int):
+        """Reserve rows and handles so the next ``count`` live enemies allocate nothing."""
+        self.enemies.reserve(count)
+        for _ in range(count - self.enemies.count - len(self._spare_enemies)):
+            self._spare_enemies.append(Enemy())
+
+    def spawn_enemy(self, x: float, y: float, kind: str = "chaser") -> Enemy:
+        e = self._spare_enemies.pop() if self._spare_enemies else Enemy()
+        self.enemies.add(e, x, y, self.tables.enemies[kind], self.enemy_kinds.index(kind), self.time)
+        self._enemy_index_dirty = True
+        return e
+
+    def apply_tables(self, changed: list[str]):
+        """Pick up hot-reloaded tables (see `Tables.poll`)."""
+        if "missiles" in changed:
+            self.missile_stats = self.tables.missiles.get("player", self.missile_stats)
+        if "weapons" in changed or "missiles" in changed:
+            weapons = self.tables.weapons
+            # Shots in flight keep their (weapon, quality) key; ones whose row is gone vanish
+            old, self.ballistics = self.ballistics, Ballistics(weapons, self.tables.missiles)
+            remap = np.array([self.ballistics.kinds.get(key, -1) for key in old.kinds], dtype=np.int16)
+            self.projectiles.remap_kinds(remap)
+            self.missiles.remap_kinds(remap)
+            if self.weapon not in weapons:
+                self.weapon = next(iter(weapons))
+            self.weapon_stats = weapons[self.weapon]
+            quality = self.weapon_quality if self.weapon_quality in self.weapon_stats else next(iter(self.weapon_stats))
+            self.set_quality(quality)
+        if "tiles" in changed:
+            self.apply_grip_preset(self.grip_mode)
+        if "enemies" in changed:
+            # Live rows keep their kind by name; `Tables.poll` refuses to drop one in use
+            templates = self.tables.enemies
+            old_kinds, self.enemy_kinds = self.enemy_kinds, list(templates)
+            enemies = self.enemies
+            n = enemies.count
+            remap = np.array([self.enemy_kinds.index(name) if name in templates else -1
+                              for name in old_kinds], dtype=enemies.kind.dtype)
+            kind = remap[enemies.kind[:n]]
+            if (kind < 0).any():
+                raise ValueError("apply_tables: live enemy kinds missing from the new table")
+            enemies.kind[:n] = kind
+            for i, name in enumerate(self.enemy_kinds):
+                mask = kind == i
+                t = templates[name]
+                enemies.accel[:n][mask] = t.accel
+                enemies.drag[:n][mask] = t.drag
+                enemies.max_speed[:n][mask] = t.max_speed
+                enemies.contact_dps[:n][mask] = t.contact_dps
+
+    def enemy_kinds_in_use(self) -> set[str]:
+        """Enemy kinds alive or still queued to spawn (see `Tables.poll`)."""
+        kinds = {self.enemy_kinds[k] for k in np.unique(self.enemies.kind[:self.enemies.count]).tolist()}
+        if self.waves is not None:
+            kinds.update(self.waves.pending_kinds())
+        return kinds
+
+    # ---- Tick driver ----
+    def advance(self, inputs: InputState, frame_dt: float) -> int:
+        """Feed real frame time into the fixed-step accumulator.
+
+        Runs as many `step()` calls as have accumulated and returns the count.
+        One-shot commands in `inputs` are applied on the first sub-step only;
+        if no step ran the caller should resend them next frame.
+        """
+        if frame_dt <= 0:
+            frame_dt = FIXED_DT
+        self._accumulator = min(self._accumulator + frame_dt, FIXED_DT * MAX_STEPS_PER_FRAME)
+        steps = 0
+        while self._accumulator >= FIXED_DT:
+            self.step(inputs if steps == 0 else inputs.held())
+            self._accumulator -= FIXED_DT
+            steps += 1
+        return steps
+
+    def step(self, inputs: InputState, dt: float = FIXED_DT):
+        if not self.started:
+            self.start()
+        if self.recorder is not None:
+            self.recorder.record(self.tick, inputs)
+        clock = time.perf_counter
+        t0 = clock()
+        self._apply_commands(inputs)
+        self._integrate_player(inputs, dt)
+        t1 = clock()
+        self._move_player(dt)
+        t2 = clock()
+        if self.waves is not None:
+            self.waves.update(dt)
+        self._update_enemies(dt)
+        t3 = clock()
+        self._update_weapon(inputs, dt)
+        t4 = clock()
+        hits = self._update_bullets(dt)
+        t5 = clock()
+        self._resolve_bullet_collisions(hits)
+        t6 = clock()
+        self._update_lock_target(dt)
+        t7 = clock()
+        if self.timer is not None:
+            self.timer.add_tick((t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4, t6 - t5, t7 - t6))
+
+        if self.waves is None and self.round_active and self.enemies.count == 0:
+            self.round_active = False
+            self.round_message = "Round Clear!"
+
+        self.tick += 1
+        self.time += dt
+
+    def _apply_commands(self, inputs: InputState):
+        if inputs.reload:
+            self._start_reload()
+        if inputs.missile:
+            self._start_missile_lock()
+        if inputs.dash:
+            if not (inputs.left or inputs.right or inputs.up or inputs.down):
+                lx, ly = self.last_move_dir
+                if lx or ly:
+                    self.dash_vel_x += lx * self.dash_impulse
+                    self.dash_vel_y += ly * self.dash_impulse
+                    dash_speed = math.hypot(self.dash_vel_x, self.dash_vel_y)
+                    if dash_speed > self.dash_max_speed:
+                        scale = self.dash_max_speed / dash_speed
+                        self.dash_vel_x *= scale
+                        self.dash_vel_y *= scale
+                    self.dash_cooldown = self.dash_cd_max
+            else:
+                self._try_dash(inputs)
+        if inputs.weapon is not None:
+            self.set_weapon(inputs.weapon)
+        if inputs.quality is not None:
+            self.set_quality(inputs.quality)
+        if inputs.grip is not None:
+            self.apply_grip_preset(inputs.grip)
+
+    def _integrate_player(self, inputs: InputState, dt: float):
+        terrain_id = self.surfaces.at(self.player.center_x, self.player.center_y)
+        if terrain_id != self.surface_id:
+            self._set_surface(terrain_id)
+        input_x = (1 if inputs.right else 0) - (1 if inputs.left else 0)
+        input_y = (1 if inputs.up else 0) - (1 if inputs.down else 0)
+        vec_len = math.hypot(input_x, input_y)
+        if vec_len > 0:
+            input_x /= vec_len
+            input_y /= vec_len
+        else:
+            input_x = input_y = 0.0
+
+        if vec_len > 0:
+            self.move_vel_x += input_x * self.traction_accel * dt
+            self.move_vel_y += input_y * self.traction_accel * dt
+
+            dirx, diry = input_x, input_y
+            proj = self.move_vel_x * dirx + self.move_vel_y * diry
+            vpx, vpy = proj * dirx, proj * diry
+            vlx, vly = self.move_vel_x - vpx, self.move_vel_y - vpy
+            side_decay = math.exp(-self.steer_align * dt)
+            self.move_vel_x = vpx + vlx * side_decay
+            self.move_vel_y = vpy + vly * side_decay
+        else:
+            speed = math.hypot(self.move_vel_x, self.move_vel_y)
+            if speed > 0:
+                decel = self.roll_friction * dt + self.roll_drag * speed * dt
+                new_speed = max(0.0, speed - decel)
+                if new_speed <= self.min_speed_cut:
+                    self.move_vel_x = 0.0
+                    self.move_vel_y = 0.0
+                else:
+                    scale = new_speed / speed
+                    self.move_vel_x *= scale
+                    self.move_vel_y *= scale
+
+        base_speed = math.hypot(self.move_vel_x, self.move_vel_y)
+        if base_speed > self.player_max_speed:
+            s = self.player_max_speed / base_speed
+            self.move_vel_x *= s
+            self.move_vel_y *= s
+
+        dash_decay = math.exp(-self.dash_decay * dt)
+        self.dash_vel_x *= dash_decay
+        self.dash_vel_y *= dash_decay
+
+        transfer = min(self.dash_transfer * dt, 1.0)
+        if transfer > 0.0:
+            self.move_vel_x += self.dash_vel_x * transfer
+            self.move_vel_y += self.dash_vel_y * transfer
+            self.dash_vel_x *= (1.0 - transfer)
+            self.dash_vel_y *= (1.0 - transfer)
+
+        self.player_vel_x = self.move_vel_x + self.dash_vel_x
+        self.player_vel_y = self.move_vel_y + self.dash_vel_y
+
+        speed = math.hypot(self.player_vel_x, self.player_vel_y)
+        max_allowed = self.dash_max_speed if speed > self.player_max_speed else self.player_max_speed
+        if speed > max_allowed:
+            scale = max_allowed / speed
+            self.player_vel_x *= scale
+            self.player_vel_y *= scale
+
+        if self.dash_cooldown > 0:
+            self.dash_cooldown = max(0.0, self.dash_cooldown - dt)
+
+    def _move_player(self, dt: float):
+        planned_move_x = self.player_vel_x * dt
+        planned_move_y = self.player_vel_y * dt
+        prev_x = self.player.center_x
+        prev_y = self.player.center_y
+
+        self.player.position = self.grid.move_and_slide(
+            prev_x, prev_y, PLAYER_HALF, PLAYER_HALF, planned_move_x, planned_move_y
+        )
+
+        self.player.center_x = max(TILE//2, min(SCREEN_W - TILE//2, self.player.center_x))
+        self.player.center_y = max(TILE//2, min(SCREEN_H - TILE//2, self.player.center_y))
+
+        actual_dx = self.player.center_x - prev_x
+        actual_dy = self.player.center_y - prev_y
+        blocked_ratio = 0.40
+        if abs(planned_move_x) > 1e-4 and abs(actual_dx) < abs(planned_move_x) * blocked_ratio:
+            self.move_vel_x = 0.0
+            self.dash_vel_x = 0.0
+        if abs(planned_move_y) > 1e-4 and abs(actual_dy) < abs(planned_move_y) * blocked_ratio:
+            self.move_vel_y = 0.0
+            self.dash_vel_y = 0.0
+
+        if dt > 0:
+            self.player_vel_x = actual_dx / dt
+            self.player_vel_y = actual_dy / dt
+        actual_speed = math.hypot(self.player_vel_x, self.player_vel_y)
+        if actual_speed > 1e-3:
+            self.last_move_dir = (self.player_vel_x / actual_speed, self.player_vel_y / actual_speed)
+
+    def _update_enemies(self, dt: float):
+        enemies = self.enemies
+        n = enemies.count
+        if n == 0:
+            return
+        px, py = self.player.center_x, self.player.center_y
+        self.flow.set_goal(*self.grid.tile_of(px, py), budget=True)
+        tiles = self.grid.tiles_of(enemies.pos[:n])
+        surfaces = self.surfaces
+        terrain = surfaces.uniform_id if surfaces.uniform_id >= 0 else surfaces.ids_at(tiles)
+        enemies.steer(self.flow.waypoints(enemies.pos[:n], (px, py), tiles), dt,
+                      surfaces.enemy_accel[terrain], surfaces.enemy_speed[terrain])
+
+        prev = enemies.pos[:n].copy()
+        self.grid.move_and_slide_many(enemies.pos[:n], ENEMY_BODY_HALF, enemies.vel[:n] * dt)
+
+        np.clip(enemies.pos[:n, 0], TILE // 2, SCREEN_W - TILE // 2, out=enemies.pos[:n, 0])
+        np.clip(enemies.pos[:n, 1], TILE // 2, SCREEN_H - TILE // 2, out=enemies.pos[:n, 1])
+        if dt > 0:
+            enemies.vel[:n] = (enemies.pos[:n] - prev) / dt
+        self._enemy_index_dirty = True
+
+        # Contact damage from every body overlapping the player's
+        reach = PLAYER_HALF + ENEMY_BODY_HALF
+        gap = np.abs(enemies.pos[:n] - (px, py))
+        touching = (gap[:, 0] < reach) & (gap[:, 1] < reach)
+        if touching.any():
+            self.damage_taken += float(enemies.contact_dps[:n][touching].sum()) * dt
+
+    def _update_weapon(self, inputs: InputState, dt: float):
+        if self.fire_cd > 0:
+            self.fire_cd -= dt
+        if self.reloading:
+            self.reload_timer -= dt
+            if self.reload_timer <= 0:
+                self.reloading = False
+                self.ammo_in_mag = self.mag_size
+        if inputs.fire and not self.reloading and self.fire_cd <= 0 and self.ammo_in_mag > 0:
+            self._fire_weapon()
+        if self.missile_cd > 0:
+            self.missile_cd -= dt
+        if self.missile_windup > 0:
+            self.missile_windup -= dt
+            if self.missile_windup <= 0:
+                self._launch_missiles()
+
+    # ---- Internal helpers ----
+    def set_quality(self, q: str):
+        if q not in self.weapon_stats:
+            return
+        self.weapon_quality = q
+        self.shot = shot = self.weapon_stats[q]
+        self.shot_kind = self.ballistics.kinds[(self.weapon, q)]
+        self._pellet_angles = fan(shot.spread, shot.pellets)
+        self.mag_size = shot.mag
+        self.bullet_damage = shot.damage
+        self.bullet_speed = shot.speed
+        self.fire_interval = 1.0 / shot.fire_rate
+        self.ammo_in_mag = min(self.ammo_in_mag, self.mag_size)
+
+    def set_weapon(self, name: str):
+        """Switch guns at the current quality; the new one comes loaded."""
+        if name not in self.tables.weapons or name == self.weapon:
+            return
+        self.weapon = name
+        self.weapon_stats = self.tables.weapons[name]
+        self.reloading = False
+        self.reload_timer = 0.0
+        quality = self.weapon_quality if self.weapon_quality in self.weapon_stats else next(iter(self.weapon_stats))
+        self.set_quality(quality)
+        self.ammo_in_mag = self.mag_size
+
+    @property
+    def loadout(self) -> dict[str, str]:
+        """Weapon, quality and grip: what `reset_round` carries into the next round."""
+        return {"weapon": self.weapon, "quality": self.weapon_quality, "grip": self.grip_mode}
+
+    def set_loadout(self, weapon: str, quality: str, grip: str):
+        """Restore a `loadout` with a full magazine, as a fresh round starts."""
+        self.set_weapon(weapon)
+        self.set_quality(quality)
+        self.apply_grip_preset(grip)
+        self.ammo_in_mag = self.mag_size
+
+    def _start_reload(self):
+        if self.reloading:
+            return
+        if self.ammo_in_mag == self.mag_size:
+            return
+        self.reloading = True
+        self.reload_timer = self.shot.reload
+
+    def _try_dash(self, inputs: InputState):
+        if self.dash_cooldown > 0:
+            return
+        horizontal_pos = inputs.right
+        horizontal_neg = inputs.left
+        vertical_pos = inputs.up
+        vertical_neg = inputs.down
+        if (horizontal_pos and horizontal_neg) or (vertical_pos and vertical_neg):
+            return
+        dirx = (1 if horizontal_pos else 0) + (-1 if horizontal_neg else 0)
+        diry = (1 if vertical_pos else 0) + (-1 if vertical_neg else 0)
+        length = math.hypot(dirx, diry)
+        if length == 0:
+            return
+        dirx /= length
+        diry /= length
+        self.dash_vel_x += dirx * self.dash_impulse
+        self.dash_vel_y += diry * self.dash_impulse
+        dash_speed = math.hypot(self.dash_vel_x, self.dash_vel_y)
+        if dash_speed > self.dash_max_speed:
+            scale = self.dash_max_speed / dash_speed
+            self.dash_vel_x *= scale
+            self.dash_vel_y *= scale
+        self.dash_cooldown = self.dash_cd_max
+
+    def _aim_dir(self) -> tuple[float, float]:
+        if self.lock_target is not None:
+            dx = self.lock_target.center_x - self.player.center_x
+            dy = self.lock_target.center_y - self.player.center_y
+            l = math.hypot(dx, dy)
+            if l > 0:
+                return (dx / l, dy / l)
+        dirx, diry = self.last_move_dir
+        l = math.hypot(dirx, diry)
+        if l == 0:
+            return (1.0, 0.0)
+        return (dirx / l, diry / l)
+
+    def _fire_weapon(self):
+        dirx, diry = self._aim_dir()
+        x, y = self.player.center_x, self.player.center_y
+        pellets = self.shot.pellets
+        if pellets == 1:
+            self.projectiles.spawn(
+                x, y, dirx * self.bullet_speed, diry * self.bullet_speed,
+                self.bullet_damage, kind=self.shot_kind,
+            )
+        else:
+            # Whole volley in one batch, fanned around the aim direction
+            angles = self._pellet_angles + math.atan2(diry, dirx)
+            vel = np.column_stack((np.cos(angles), np.sin(angles))) * self.bullet_speed
+            self.projectiles.spawn_many((x, y), vel, self.bullet_damage, kind=self.shot_kind)
+        self.ammo_in_mag -= 1
+        self.shots_fired += pellets
+        self.fire_cd = self.fire_interval
+        if self.ammo_in_mag <= 0:
+            self._start_reload()
+
+    def _start_missile_lock(self):
+        """Begin the lock windup on the current target (needs one, and no cooldown)."""
+        if self.missile_cd > 0 or self.missile_windup > 0 or self.lock_target is None:
+            return
+        self._missile_target = self.lock_target
+        self.missile_windup = max(self.missile_stats.windup, 1e-9)
+
+    def _launch_missiles(self):
+        stats = self.missile_stats
+        target = self._missile_target  # None if it died during the windup
+        self._missile_target = None
+        self.missile_cd = stats.cooldown
+        dirx, diry = self._aim_dir()
+        self.missiles.launch(
+            self.player.center_x, self.player.center_y,
+            fan(stats.spread, stats.salvo) + math.atan2(diry, dirx),
+            stats.speed, math.radians(stats.turn_rate), stats.lifetime, stats.damage,
+            target.slot if target is not None else -1,
+            kind=self.ballistics.kinds[("missile", "player")],
+        )
+        self.shots_fired += stats.salvo
+
+    def _update_bullets(self, dt: float):
+        enemies = self.enemies
+        index = self.nearby_enemies()
+        impacts = self.projectiles.advance(dt, self.grid, index, ENEMY_HALF, self.ballistics.max_range)
+        missiles = self.missiles
+        if len(missiles):
+            if enemies.count:
+                missiles.reacquire(dt, index)
+            missiles.steer(dt, enemies.pos[:enemies.count])
+            impacts = impacts.merge(missiles.advance(dt, self.grid, index, ENEMY_HALF))
+        return impacts
+
+    def _resolve_bullet_collisions(self, impacts: Impacts):
+        """Queue direct hits (after range falloff) and splash, then apply the tick's damage.
+
+        Splash finds its victims through the enemy spatial index, so a
+        rocket into a crowd only touches the enemies near the blast; the
+        enemy it hit directly is left out of its own blast.
+        """
+        enemies = self.enemies
+        if len(impacts.target):
+            ballistics = self.ballistics
+            queue = self.damage.queue
+            direct = impacts.target >= 0
+            self.shots_hit += int(np.count_nonzero(direct))
+            kind = impacts.kind[direct]
+            queue.push(impacts.target[direct],
+                       impacts.damage[direct] * ballistics.falloff(kind, impacts.travelled[direct]),
+                       ballistics.pierce[kind], ballistics.burn_dps[kind], ballistics.burn_time[kind])
+            blasts = np.flatnonzero(ballistics.splash_radius[impacts.kind] > 0)
+            if len(blasts) and enemies.count:
+                index = self.nearby_enemies()
+                for i in blasts.tolist():
+                    k = int(impacts.kind[i])
+                    x, y = impacts.pos[i].tolist()
+                    near = index.query_radius(x, y, ballistics.splash_radius[k])
+                    near = near[near != impacts.target[i]]  # The direct hit already took its damage
+                    if len(near):
+                        d = index.pos[near] - (x, y)
+                        queue.push(near, ballistics.splash(k, np.hypot(d[:, 0], d[:, 1])),
+                                   ballistics.pierce[k], ballistics.burn_dps[k], ballistics.burn_time[k])
+        dead = self.damage.update(self.tick, self.time)
+        log = self.damage.log
+        if len(log.rows) == 0:
+            return
+        for listener in self.on_damage:
+            listener(log)
+        for e in [enemies.handles[i] for i in dead.tolist()]:
+            self._remove_enemy(e)
+
+    def _remove_enemy(self, e: Enemy):
+        """Drop a dead enemy: swap-remove its row and recycle its handle."""
+        enemies = self.enemies
+        x, y = enemies.pos[e.slot]
+        kind = self.enemy_kinds[enemies.kind[e.slot]]
+        lifetime = self.time - float(enemies.born[e.slot])
+        row, last = e.slot, enemies.count - 1
+        enemies.remove(row)
+        self.missiles.retarget_removed(row, last)
+        self._enemy_index_dirty = True
+        if self.lock_target is e:
+            self.lock_target = None
+            self._lock_timer = 0.0  # Pick the next one right away
+        if self._missile_target is e:
+            self._missile_target = None
+        self._spare_enemies.append(e)
+        self.kill_count += 1
+        event = EnemyDeath(self.tick, float(x), float(y), kind, lifetime)
+        for listener in self.on_enemy_death:
+            listener(event)
+
+    def nearby_enemies(self) -> SpatialGrid:
+        """Enemy spatial index, current as of the latest move/removal."""
+        if self._enemy_index_dirty:
+            self.enemy_index.rebuild(self.enemies.pos[:self.enemies.count])
+            self._enemy_index_dirty = False
+        return self.enemy_index
+
+    def enemies_in_sight(self) -> np.ndarray:
+        """Per enemy row: whether it has line of sight to the player's tile."""
+        return self.sight.visible(self.enemies.pos[:self.enemies.count], self.player.position)
+
+    def _update_lock_target(self, dt: float):
+        if self.enemies.count == 0:
+            self.lock_target = None
+            self._lock_timer = 0.0
+            return
+        # Also paced with no target, so a crowd out of sight is not searched every tick
+        self._lock_timer -= dt
+        if self._lock_timer > 0:
+            return
+        self._lock_timer = self.lock_reacquire_interval
+
+        # Only enemies the player can see are lockable. The plain nearest
+        # one usually is; the whole crowd is only checked when it is not
+        px, py = self.player.center_x, self.player.center_y
+        pos = self.enemies.pos
+        current = self.lock_target
+        if current is not None and not self.sight.clear(*pos[current.slot], px, py):
+            current = self.lock_target = None
+        index = self.nearby_enemies()
+        best, best_d = index.nearest(px, py)
+        if best >= 0 and not self.sight.clear(*pos[best], px, py):
+            best, best_d = index.nearest(px, py, mask=self.enemies_in_sight())
+        if best < 0:
+            return
+        if current is not None:
+            cur_d = math.hypot(current.center_x - px, current.center_y - py)
+            if best_d > cur_d - self.lock_switch_margin:
+                return
+        self.lock_target = self.enemies.handles[best]
@@ -0,0 +1,122 @@
+import math
+import numpy as np
+
+
+class SpatialGrid:
+    """Uniform bucket grid over a set of points, for proximity queries.
+
+    `rebuild()` bins all points with one counting sort; each cell then holds
+    a contiguous run of point indices in ``order``. Queries only touch the
+    cells around the query point.
+    """
+
+    def __init__(self, width: float, height: float, cell: float):
+        self.cell = cell
+        self.cols = max(1, math.ceil(width / cell))
+        self.rows = max(1, math.ceil(height / cell))
+        self.pos = np.zeros((0, 2))
+        self.order = np.zeros(0, dtype=np.intp)
+        self.start = np.zeros(self.cols * self.rows + 1, dtype=np.intp)
+
+    def rebuild(self, pos: np.ndarray):
+        self.pos = pos
+        if len(pos) == 0:
+            self.order = np.zeros(0, dtype=np.intp)
+            self.start[:] = 0
+            return
+        cx = np.clip((pos[:, 0] // self.cell).astype(np.intp), 0, self.cols - 1)
+        cy = np.clip((pos[:, 1] // self.cell).astype(np.intp), 0, self.rows - 1)
+        ids = cy * self.cols + cx
+        self.order = np.argsort(ids, kind="stable")
+        counts = np.bincount(ids, minlength=self.cols * self.rows)
+        self.start[0] = 0
+        np.cumsum(counts, out=self.start[1:])
+
+    def _cell_items(self, cx: int, cy: int) -> np.ndarray:
+        i = cy * self.cols + cx
+        return self.order[self.start[i]:self.start[i + 1]]
+
+    def _ring(self, cx: int, cy: int, k: int):
+        """Non-empty cell runs at Chebyshev distance ``k`` from (cx, cy)."""
+        x0, x1 = max(cx - k, 0), min(cx + k, self.cols - 1)
+        y0, y1 = max(cy - k, 0), min(cy + k, self.rows - 1)
+        for y in range(y0, y1 + 1):
+            if k == 0 or y == cy - k or y == cy + k:
+                xs = range(x0, x1 + 1)
+            else:
+                xs = [x for x in (cx - k, cx + k) if x0 <= x <= x1]
+            for x in xs:
+                items = self._cell_items(x, y)
+                if len(items):
+                    yield items
+
+    def nearest(self, x: float, y: float, max_dist: float = math.inf,
+                mask: np.ndarray | None = None) -> tuple[int, float]:
+        """Index of the closest point within ``max_dist`` and its distance.
+
+        Searches rings of cells outward and stops once no unvisited cell can
+        beat the best hit. Points where ``mask`` is False are skipped.
+        Returns (-1, inf) when nothing is in range.
+        """
+        if len(self.pos) == 0:
+            return -1, math.inf
+        cx = min(max(int(x // self.cell), 0), self.cols - 1)
+        cy = min(max(int(y // self.cell), 0), self.rows - 1)
+        best, best_d = -1, math.inf
+        max_k = max(self.cols, self.rows)
+        for k in range(max_k + 1):
+            # Anything outside the rings visited so far is at least this far away
+            if min(best_d, max_dist) <= (k - 1) * self.cell:
+                break
+            for items in self._ring(cx, cy, k):
+                if mask is not None:
+                    items = items[mask[items]]
+                    if not len(items):
+                        continue
+                d = self.pos[items] - (x, y)
+                d2 = np.einsum("ij,ij->i", d, d)
+                j = int(np.argmin(d2))
+                dist = math.sqrt(d2[j])
+                if dist < best_d:
+                    best, best_d = int(items[j]), dist
+        if best_d > max_dist:
+            return -1, math.inf
+        return best, best_d
+
+    def query_radius(self, x: float, y: float, radius: float) -> np.ndarray:
+        """Indices of all points within ``radius`` of (x, y)."""
+        if len(self.pos) == 0:
+            return np.zeros(0, dtype=np.intp)
+        c0 = max(int((x - radius) // self.cell), 0)
+        c1 = min(int((x + radius) // self.cell), self.cols - 1)
+        r0 = max(int((y - radius) // self.cell), 0)
+        r1 = min(int((y + radius) // self.cell), self.rows - 1)
+        runs = [self._cell_items(c, r) for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)]
+        if not runs:
+            return np.zeros(0, dtype=np.intp)
+        items = np.concatenate(runs)
+        d = self.pos[items] - (x, y)
+        return items[np.einsum("ij,ij->i", d, d) <= radius * radius]
+
+    def query_boxes(self, lo: np.ndarray, hi: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Candidate points for many axis-aligned boxes ``lo[i]``..``hi[i]`` at once.
+
+        Returns parallel (box, point) index arrays covering every point whose
+        cell overlaps its box; callers run the exact test on these pairs.
+        """
+        empty = np.zeros(0, dtype=np.intp)
+        if len(self.pos) == 0 or len(lo) == 0:
+            return empty, empty
+        c0 = np.clip((lo[:, 0] // self.cell).astype(np.intp), 0, self.cols - 1)
+        c1 = np.clip((hi[:, 0] // self.cell).astype(np.intp), 0, self.cols - 1)
+        r0 = np.clip((lo[:, 1] // self.cell).astype(np.intp), 0, self.rows - 1)
+        r1 = np.clip((hi[:, 1] // self.cell).astype(np.intp), 0, self.rows - 1)
+        width = c1 - c0 + 1
+        cells = width * (r1 - r0 + 1)
+        box = np.repeat(np.arange(len(lo)), cells)
+        k = np.arange(len(box)) - np.repeat(np.cumsum(cells) - cells, cells)
+        ids = (r0[box] + k // width[box]) * self.cols + c0[box] + k % width[box]
+        first, counts = self.start[ids], self.start[ids + 1] - self.start[ids]
+        box = np.repeat(box, counts)
+        k = np.arange(len(box)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return box, self.order[np.repeat(first, counts) + k]
@@ -0,0 +1,103 @@
+import math
+
+import numpy as np
+
+from flowfield import UNREACHED
+
+
+class SpawnSampler:
+    """Random spawn tiles under distance and spread rules, without map scans.
+
+    Every floor tile sits in a flat index array (``cells``) with a reverse
+    map (``slot``), patched in O(1) when `TileGrid.set_solid` flips a tile;
+    a whole-map `TileGrid.load` triggers one rebuild on the next sample.
+    Path distance comes from the shared `FlowField`, re-rooted at the
+    origin on its step budget (normally the player, whose field is usually
+    cached already), so ``min_steps`` may be off by the tile or two the
+    field trails a moving origin.
+    Sampling k points costs O(k) expected draws, not O(map).
+    """
+
+    def __init__(self, grid, flow, tries_per_point: int = 8):
+        self.grid = grid
+        self.flow = flow
+        self.tries_per_point = tries_per_point
+        size = grid.cols * grid.rows
+        self.cells = np.zeros(size, dtype=np.intp)
+        self.slot = np.full(size, -1, dtype=np.intp)
+        self.count = 0
+        self.version = None  # Grid version the index reflects
+        grid.on_change.append(self._on_change)
+
+    def _rebuild(self):
+        free = np.flatnonzero(self.grid.solid.ravel() == 0)
+        self.count = len(free)
+        self.cells[:self.count] = free
+        self.slot[:] = -1
+        self.slot[free] = np.arange(self.count)
+        self.version = self.grid.version
+
+    def _on_change(self, c: int, r: int):
+        grid = self.grid
+        if self.version != grid.version - 1:
+            return  # Already stale; the next sample rebuilds
+        self.version = grid.version
+        i = r * grid.cols + c
+        j = self.slot[i]
+        if grid.solid[r, c] == 0:
+            if j < 0:
+                self.cells[self.count] = i
+                self.slot[i] = self.count
+                self.count += 1
+        elif j >= 0:
+            last = self.count - 1
+            moved = self.cells[last]
+            self.cells[j] = moved
+            self.slot[moved] = j
+            self.slot[i] = -1
+            self.count = last
+
+    def sample(self, k: int, rng, origin: tuple[float, float], safe_radius: float = 0.0,
+               min_steps: int = 0, spread: int = 1) -> list[tuple[float, float]]:
+        """Up to ``k`` tile centres reachable from ``origin``.
+
+        Each point is at least ``safe_radius`` px (straight line) and
+        ``min_steps`` tiles (walking) from ``origin``, and at least
+        ``spread`` tiles (Chebyshev) from the other points returned. Gives
+        up after ``tries_per_point * k`` draws, so a crowded map yields
+        fewer points instead of a stall.
+        """
+        grid = self.grid
+        if self.version != grid.version:
+            self._rebuild()
+        n = self.count
+        if k <= 0 or n == 0:
+            return []
+        ox, oy = origin
+        self.flow.set_goal(*grid.tile_of(ox, oy), budget=True)
+        dist = self.flow.dist
+        cols, t = grid.cols, grid.tile
+        # Spread buckets: points within ``spread`` tiles share a bucket or a neighbour
+        bucket = max(spread, 1)
+        taken: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        out: list[tuple[float, float]] = []
+        for _ in range(self.tries_per_point * k):
+            r, c = divmod(int(self.cells[rng.randrange(n)]), cols)
+            d = dist[r, c]
+            if d == UNREACHED or d < min_steps:
+                continue
+            x, y = (c + 0.5) * t, (r + 0.5) * t
+            if math.hypot(x - ox, y - oy) < safe_radius:
+                continue
+            bc, br = c // bucket, r // bucket
+            if spread > 0 and any(
+                max(abs(c - c2), abs(r - r2)) < spread
+                for dc in (-1, 0, 1) for dr in (-1, 0, 1)
+                for c2, r2 in taken.get((bc + dc, br + dr), ())
+            ):
+                continue
+            taken.setdefault((bc, br), []).append((c, r))
+            out.append((x, y))
+            if len(out) == k:
+                break
+        return out
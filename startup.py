@@ -0,0 +1,160 @@
+"""Cold-start report with a per-step time budget.
+
+Times the first import of every module pulled in (self and inclusive time),
+then the setup steps up to the first frame: window creation, `_build_level`
+and the opening `_spawn_enemies`. Steps over their budget are flagged and
+make the exit status 1, so the numbers can be tracked in CI.
+
+    python startup.py [--headless] [--seed N] [--json]
+
+``--headless`` measures the simulation-only path and also fails if anything
+imported arcade. For a finer breakdown use ``python -X importtime``.
+"""
+import argparse
+import builtins
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+# Step -> budget in ms
+BUDGET_MS = {
+    "import": 1500.0,
+    "import (headless)": 150.0,
+    "window": 500.0,
+    "simulation": 50.0,
+    "build_level": 20.0,
+    "spawn_enemies": 5.0,
+    "first_frame": 100.0,
+}
+TOP_MODULES = 12
+
+
+class StartupReport:
+    def __init__(self):
+        self.steps: list[tuple[str, float]] = []
+        # Module -> [self seconds, inclusive seconds]
+        self.modules: dict[str, list[float]] = {}
+
+    def add(self, name: str, seconds: float):
+        self.steps.append((name, seconds))
+
+    @contextmanager
+    def step(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    @contextmanager
+    def imports(self, name: str = "import"):
+        """Time the block as one step and every first-time import inside it."""
+        original = builtins.__import__
+        stack: list[float] = []  # Child time accumulated per open import
+
+        def timed_import(mod, globals=None, locals=None, fromlist=(), level=0):
+            if level or mod in sys.modules:
+                return original(mod, globals, locals, fromlist, level)
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return original(mod, globals, locals, fromlist, level)
+            finally:
+                total = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += total
+                self.modules.setdefault(mod, [total - children, total])
+
+        builtins.__import__ = timed_import
+        try:
+            with self.step(name):
+                yield
+        finally:
+            builtins.__import__ = original
+
+    def over_budget(self) -> list[str]:
+        return [name for name, seconds in self.steps
+                if seconds * 1000.0 > BUDGET_MS.get(name, float("inf"))]
+
+    def as_dict(self) -> dict:
+        return {
+            "steps": {name: seconds * 1000.0 for name, seconds in self.steps},
+            "budget_ms": {name: BUDGET_MS[name] for name, _ in self.steps if name in BUDGET_MS},
+            "modules_ms": {mod: {"self": s * 1000.0, "inclusive": t * 1000.0}
+                           for mod, (s, t) in self.modules.items()},
+            "over_budget": self.over_budget(),
+        }
+
+    def format(self) -> str:
+        over = set(self.over_budget())
+        lines = [f"{'step':20s} {'ms':>9s} {'budget':>9s}"]
+        for name, seconds in self.steps:
+            budget = BUDGET_MS.get(name)
+            flag = "  OVER" if name in over else ""
+            budget_txt = f"{budget:9.1f}" if budget is not None else f"{'-':>9s}"
+            lines.append(f"{name:20s} {seconds * 1000.0:9.1f} {budget_txt}{flag}")
+        lines.append("")
+        lines.append(f"{'module (slowest)':32s} {'self ms':>9s} {'incl ms':>9s}")
+        ranked = sorted(self.modules.items(), key=lambda kv: kv[1][0], reverse=True)
+        for mod, (own, total) in ranked[:TOP_MODULES]:
+            lines.append(f"{mod:32s} {own * 1000.0:9.1f} {total * 1000.0:9.1f}")
+        return "\n".join(lines)
+
+
+def measure_headless(report: StartupReport, seed: int | None) -> bool:
+    with report.imports("import (headless)"):
+        from simulation import Simulation
+    with report.step("simulation"):
+        sim = Simulation(seed)
+    sim.start()
+    for name in ("build_level", "spawn_enemies"):
+        report.add(name, sim.startup_times[name])
+    return "arcade" not in sys.modules
+
+
+def measure_window(report: StartupReport, seed: int | None):
+    with report.imports():
+        import arcade
+        import main
+    with report.step("window"):
+        game = main.Game(seed)
+    game.sim.start()
+    for name in ("build_level", "spawn_enemies"):
+        report.add(name, game.sim.startup_times[name])
+    with report.step("first_frame"):
+        game.on_update(1 / 120)
+        game.on_draw()
+        game.flip()
+    arcade.exit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report cold-start time against the budget.")
+    parser.add_argument("--headless", action="store_true", help="simulation only (no arcade)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    report = StartupReport()
+    arcade_free = True
+    if args.headless:
+        arcade_free = measure_headless(report, args.seed)
+    else:
+        measure_window(report, args.seed)
+
+    if args.json:
+        data = report.as_dict()
+        if args.headless:
+            data["arcade_imported"] = not arcade_free
+        print(json.dumps(data, indent=2))
+    else:
+        print(report.format())
+        if not arcade_free:
+            print("\narcade was imported on the headless path")
+    sys.exit(1 if report.over_budget() or not arcade_free else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+from arcade.gl import geometry
+
+_VERTEX = """
+#version 330
+in vec2 in_vert;
+in vec2 in_uv;
+out vec2 uv;
+void main() {
+    gl_Position = vec4(in_vert, 0.0, 1.0);
+    uv = in_uv;
+}
+"""
+
+_FRAGMENT = """
+#version 330
+uniform sampler2D layer;
+in vec2 uv;
+out vec4 frag;
+void main() {
+    frag = texture(layer, uv);
+}
+"""
+
+
+class StaticLayer:
+    """Geometry that never moves, baked once into an offscreen texture.
+
+    `bake()` renders the background plus whatever ``draw_fn`` draws into a
+    framebuffer; `draw()` then puts it on screen as one full-screen quad, so
+    the per-frame cost does not depend on how many sprites were baked.
+    Call `bake()` again only when the static geometry changes.
+    """
+
+    def __init__(self, ctx, size: tuple[int, int], background):
+        self.ctx = ctx
+        self.size = size
+        self.background = background
+        self.texture = ctx.texture(size, components=4)
+        self.fbo = ctx.framebuffer(color_attachments=[self.texture])
+        self.quad = geometry.quad_2d_fs()
+        self.program = ctx.program(vertex_shader=_VERTEX, fragment_shader=_FRAGMENT)
+        self.program["layer"] = 0
+        self.version = None  # Source version the bake reflects
+
+    def bake(self, draw_fn, version=None):
+        with self.fbo.activate():
+            self.fbo.clear(color=self.background)
+            draw_fn()
+        self.version = version
+
+    def draw(self):
+        self.texture.use(0)
+        self.quad.render(self.program)
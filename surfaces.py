@@ -0,0 +1,58 @@
+import numpy as np
+
+from tables import SurfaceParams
+
+REFERENCE = "medium"  # Enemy templates are tuned for this surface
+_MAX_SPEED = SurfaceParams._fields.index("player_max_speed")
+_TRACTION = SurfaceParams._fields.index("traction_accel")
+
+
+class SurfaceMap:
+    """Terrain id per tile plus surface parameters indexed by terrain id.
+
+    Id 0 is the base floor (the grip mode); ids 1.. are the level's patches.
+    """
+
+    def __init__(self, cols: int, rows: int, tile: int):
+        self.cols = cols
+        self.rows = rows
+        self.tile = tile
+        self.ids = np.zeros((rows, cols), dtype=np.uint8)
+        self._rows = self.ids.tolist()
+        self.names: tuple[str, ...] = ()
+        self.records: tuple[SurfaceParams, ...] = ()
+        self.params = np.zeros((0, len(SurfaceParams._fields)))  # (terrain, field)
+        self.enemy_speed = np.ones(1)
+        self.enemy_accel = np.ones(1)
+        self.uniform_id = 0  # Id whose parameters every tile shares, else -1
+
+    def load(self, tiles: dict[str, SurfaceParams], names: tuple[str, ...],
+             ids: np.ndarray | None = None):
+        """Bind terrain ids to ``tiles`` presets; ``names[0]`` is the base floor.
+
+        Unknown names fall back to the base floor. ``ids`` replaces the
+        terrain layer; omit it to keep the current one (a preset change).
+        """
+        base = tiles[names[0]]
+        self.names = tuple(names)
+        self.records = tuple(tiles.get(name, base) for name in names)
+        self.params = np.array(self.records, dtype=float)
+        ref = tiles.get(REFERENCE, base)
+        self.enemy_speed = self.params[:, _MAX_SPEED] / ref.player_max_speed
+        self.enemy_accel = self.params[:, _TRACTION] / ref.traction_accel
+        if ids is not None:
+            self.ids[:] = ids
+            self._rows = self.ids.tolist()
+        used = np.unique(self.ids)
+        same = (self.params[used] == self.params[used[0]]).all()
+        self.uniform_id = int(used[0]) if same else -1
+
+    def at(self, x: float, y: float) -> int:
+        """Terrain id under a point (clamped to the map)."""
+        c = min(max(int(x // self.tile), 0), self.cols - 1)
+        r = min(max(int(y // self.tile), 0), self.rows - 1)
+        return self._rows[r][c]
+
+    def ids_at(self, tiles: tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+        """Terrain id for each tile of a (rows, cols) pair from `TileGrid.tiles_of`."""
+        return self.ids[tiles]
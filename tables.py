@@ -0,0 +1,274 @@
+import hashlib
+import json
+import os
+import pickle
+from typing import NamedTuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CACHE_FORMAT = 5
+
+
+class WeaponStats(NamedTuple):
+    damage: float
+    mag: int
+    fire_rate: float
+    reload: float
+    speed: float = 1680.0  # px/s (14 px per 1/120 s tick)
+    pellets: int = 1  # Projectiles per shot, fanned evenly across ``spread``
+    spread: float = 0.0  # Degrees between the outermost pellets
+    falloff_start: float = 0.0  # px travelled at full damage
+    falloff_end: float = 0.0  # px where damage reaches falloff_min and the shot expires; 0 = never
+    falloff_min: float = 1.0  # Damage fraction at falloff_end
+    splash_radius: float = 0.0  # px around the impact point; 0 = no splash
+    splash_damage: float = 0.0  # At the impact point
+    splash_min: float = 1.0  # Splash fraction at the radius edge
+    pierce: float = 0.0  # Fraction of damage that skips armor
+    burn_dps: float = 0.0  # Incendiary damage over time (refreshes, does not stack)
+    burn_time: float = 0.0
+
+
+class MissileStats(NamedTuple):
+    windup: float  # s of lock before the salvo leaves
+    salvo: int  # Missiles per launch, fanned across ``spread``
+    spread: float  # Degrees between the outermost missiles at launch
+    damage: float
+    speed: float  # px/s
+    turn_rate: float  # Degrees per second
+    lifetime: float  # s before an unspent missile fizzles
+    cooldown: float  # s from launch to the next lock
+    splash_radius: float = 0.0
+    splash_damage: float = 0.0
+    splash_min: float = 1.0
+
+
+class SurfaceParams(NamedTuple):
+    player_max_speed: float
+    traction_accel: float
+    roll_friction: float
+    roll_drag: float
+    steer_align: float
+    min_speed_cut: float
+    dash_decay: float
+    dash_transfer: float
+
+
+class EnemyTemplate(NamedTuple):
+    hp: float
+    accel: float
+    drag: float
+    max_speed: float
+    contact_dps: float  # Damage per second to the player while touching
+    armor: float = 0.0  # Second bar, soaks damage before hp
+    armor_regen: float = 0.0  # Armor per second after a few seconds without hits
+
+
+class WaveSpec(NamedTuple):
+    at: float  # s after the round starts
+    enemy: str  # Key in enemies.json
+    count: int
+    interval: float  # s between spawns within the wave
+
+
+# Numeric fields must be >= 0; these must also be > 0 or within [0, 1]
+_POSITIVE = {
+    WeaponStats: {"mag", "fire_rate", "speed", "pellets"},
+    MissileStats: {"salvo", "speed", "lifetime"},
+    SurfaceParams: {"player_max_speed"},
+    EnemyTemplate: {"hp"},
+    WaveSpec: {"count"},
+}
+_FRACTION = {
+    WeaponStats: {"falloff_min", "splash_min", "pierce"},
+    MissileStats: {"splash_min"},
+}
+
+
+def _record(cls, raw, where: str):
+    """Build a typed record from a JSON object, rejecting missing/unknown keys.
+
+    Fields with a default in ``cls`` may be left out. Numbers are range
+    checked here so a bad value fails the load, not the game using it.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError(f"{where}: expected an object")
+    fields = cls._fields
+    defaults = cls._field_defaults
+    missing = [f for f in fields if f not in raw and f not in defaults]
+    unknown = [k for k in raw if k not in fields]
+    if missing or unknown:
+        raise ValueError(f"{where}: missing {missing} / unknown {unknown}")
+    values = []
+    for name in fields:
+        if name not in raw:
+            values.append(defaults[name])
+            continue
+        kind = cls.__annotations__[name]
+        value = raw[name]
+        if kind is str:
+            if not isinstance(value, str):
+                raise ValueError(f"{where}.{name}: expected a string, got {value!r}")
+            values.append(value)
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{where}.{name}: expected a number, got {value!r}")
+        if kind is int and value != int(value):
+            raise ValueError(f"{where}.{name}: expected an integer, got {value!r}")
+        if name in _POSITIVE.get(cls, ()):
+            if value <= 0:
+                raise ValueError(f"{where}.{name}: expected a positive number, got {value!r}")
+        elif value < 0:
+            raise ValueError(f"{where}.{name}: expected a non-negative number, got {value!r}")
+        if value > 1 and name in _FRACTION.get(cls, ()):
+            raise ValueError(f"{where}.{name}: expected a fraction in [0, 1], got {value!r}")
+        values.append(kind(value))
+    return cls(*values)
+
+
+def _named(cls, raw, where: str) -> dict:
+    if not isinstance(raw, dict) or not raw:
+        raise ValueError(f"{where}: expected a non-empty object")
+    return {name: _record(cls, entry, f"{where}.{name}") for name, entry in raw.items()}
+
+
+def _compile_weapons(raw) -> dict[str, dict[str, WeaponStats]]:
+    if not isinstance(raw, dict):
+        raise ValueError("weapons: expected an object")
+    return {weapon: _named(WeaponStats, qualities, f"weapons.{weapon}")
+            for weapon, qualities in raw.items()}
+
+
+def _compile_waves(raw) -> dict[str, tuple[WaveSpec, ...]]:
+    """Round name -> its waves sorted by start time; file order is play order."""
+    if not isinstance(raw, dict) or not raw:
+        raise ValueError("waves: expected a non-empty object")
+    rounds = {}
+    for name, waves in raw.items():
+        if not isinstance(waves, list):
+            raise ValueError(f"waves.{name}: expected a list")
+        specs = [_record(WaveSpec, w, f"waves.{name}[{i}]") for i, w in enumerate(waves)]
+        rounds[name] = tuple(sorted(specs, key=lambda w: w.at))
+    return rounds
+
+
+def _check_waves(waves: dict[str, tuple[WaveSpec, ...]], enemies: dict[str, EnemyTemplate]):
+    """Reject waves that spawn an enemy the enemies table does not define."""
+    for name, specs in waves.items():
+        for spec in specs:
+            if spec.enemy not in enemies:
+                raise ValueError(f"waves.{name}: unknown enemy {spec.enemy!r}")
+
+
+# Table name -> compiler from parsed JSON to records
+COMPILERS = {
+    "weapons": _compile_weapons,
+    "tiles": lambda raw: _named(SurfaceParams, raw, "tiles"),
+    "enemies": lambda raw: _named(EnemyTemplate, raw, "enemies"),
+    "waves": _compile_waves,
+    "missiles": lambda raw: _named(MissileStats, raw, "missiles"),
+}
+
+
+class Tables:
+    """Design tables loaded from ``data/*.json`` and compiled to typed records.
+
+    Compiled records are pickled under ``data/.cache`` keyed by the source
+    file's mtime/size and SHA-1, so an unchanged file is never re-parsed.
+    `poll()` picks up edited files while the game runs.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR, cache_dir: str | None = None):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir or os.path.join(data_dir, ".cache")
+        self._stamps: dict[str, tuple[int, int]] = {}
+        for name in COMPILERS:
+            setattr(self, name, self._load(name))
+        _check_waves(self.waves, self.enemies)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.data_dir, f"{name}.json")
+
+    def _load(self, name: str):
+        path = self._path(name)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cache_path = os.path.join(self.cache_dir, f"{name}.pickle")
+        cached = None
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+            if cached.get("format") != CACHE_FORMAT:
+                cached = None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+            cached = None
+
+        if cached is not None and cached["stamp"] == stamp:
+            self._stamps[name] = stamp
+            return cached["records"]
+
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        if cached is not None and cached["sha1"] == digest:
+            records = cached["records"]
+        else:
+            try:
+                raw = json.loads(data)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path}: {exc}") from None
+            records = COMPILERS[name](raw)
+        self._write_cache(cache_path, {"format": CACHE_FORMAT, "stamp": stamp,
+                                       "sha1": digest, "records": records})
+        self._stamps[name] = stamp
+        return records
+
+    def _write_cache(self, cache_path: str, payload: dict):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = cache_path + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass  # Read-only checkout: just skip caching
+
+    def poll(self, enemies_in_use=()) -> list[str]:
+        """Reload tables whose files changed on disk; returns their names.
+
+        A file that fails to read, parse or validate keeps its previous
+        records (the error is printed) so a half-saved edit cannot crash the
+        game.
+        The same goes for an enemies/waves edit that leaves a wave naming
+        an undefined enemy, or that drops a kind in ``enemies_in_use``.
+        """
+        staged = {}
+        for name in COMPILERS:
+            try:
+                st = os.stat(self._path(name))
+            except OSError:
+                continue
+            if (st.st_mtime_ns, st.st_size) == self._stamps.get(name):
+                continue
+            try:
+                records = self._load(name)
+            except (ValueError, OSError) as exc:  # OSError: file swapped out mid-save
+                self._stamps[name] = (st.st_mtime_ns, st.st_size)
+                print(f"[tables] {exc}")
+                continue
+            if records != getattr(self, name):
+                staged[name] = records
+
+        if "enemies" in staged or "waves" in staged:
+            enemies = staged.get("enemies", self.enemies)
+            try:
+                dropped = sorted(set(enemies_in_use) - set(enemies))
+                if dropped:
+                    raise ValueError(f"enemies: {dropped} still in use")
+                _check_waves(staged.get("waves", self.waves), enemies)
+            except ValueError as exc:
+                staged.pop("enemies", None)
+                staged.pop("waves", None)
+                print(f"[tables] {exc}")
+
+        for name, records in staged.items():
+            setattr(self, name, records)
+        return list(staged)
@@ -0,0 +1,214 @@
+import math
+from typing import Callable
+
+import numpy as np
+
+# Tile kinds stored in `TileGrid.solid`; any non-zero value blocks movement
+EMPTY, WALL, OBSTACLE = 0, 1, 2
+
+
+class TileGrid:
+    """Compact wall occupancy map, one byte per tile.
+
+    Indexed ``solid[row, col]`` like `levelgen` levels, with row 0 at the
+    bottom and tile centres at ``col * tile + tile / 2``. Anything outside
+    the grid counts as solid.
+    """
+
+    def __init__(self, cols: int, rows: int, tile: int):
+        self.cols = cols
+        self.rows = rows
+        self.tile = tile
+        self.solid = np.zeros((rows, cols), dtype=np.uint8)
+        self.version = 0  # Bumped on every change so caches can invalidate
+        # Called with (col, row) after each single-tile change
+        self.on_change: list[Callable[[int, int], None]] = []
+
+    def set_solid(self, c: int, r: int, value: int = WALL):
+        self.solid[r, c] = int(value)
+        self.version += 1
+        for listener in self.on_change:
+            listener(c, r)
+
+    def load(self, solid: np.ndarray):
+        """Replace the whole map with a ``[row, col]`` tile-kind array."""
+        self.solid[:] = solid
+        self.version += 1
+
+    def is_solid(self, c: int, r: int) -> bool:
+        if c < 0 or r < 0 or c >= self.cols or r >= self.rows:
+            return True
+        return bool(self.solid[r, c])
+
+    def tile_of(self, x: float, y: float) -> tuple[int, int]:
+        return int(x // self.tile), int(y // self.tile)
+
+    def tiles_of(self, pos: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(rows, cols) of the tile under each (x, y) row, clamped to the grid."""
+        t = self.tile
+        c = np.clip((pos[:, 0] // t).astype(np.intp), 0, self.cols - 1)
+        r = np.clip((pos[:, 1] // t).astype(np.intp), 0, self.rows - 1)
+        return r, c
+
+    # ---- Move-and-slide (single mover) ----
+    def move_and_slide(self, x: float, y: float, half_w: float, half_h: float,
+                       dx: float, dy: float) -> tuple[float, float]:
+        """Move an AABB by (dx, dy), x axis first, stopping flush against walls.
+
+        Only tiles the leading edge enters are tested, so the cost is the
+        number of cells swept and large steps cannot tunnel.
+        """
+        x = self._sweep_x(x, y, half_w, half_h, dx)
+        y = self._sweep_y(x, y, half_w, half_h, dy)
+        return x, y
+
+    def _sweep_x(self, x, y, hw, hh, dx):
+        if dx == 0:
+            return x
+        t = self.tile
+        r0 = math.floor((y - hh) / t)
+        r1 = math.ceil((y + hh) / t) - 1
+        if dx > 0:
+            start = math.ceil((x + hw) / t)
+            end = math.ceil((x + dx + hw) / t) - 1
+            for c in range(start, end + 1):
+                if any(self.is_solid(c, r) for r in range(r0, r1 + 1)):
+                    return c * t - hw
+        else:
+            start = math.floor((x - hw) / t) - 1
+            end = math.floor((x + dx - hw) / t)
+            for c in range(start, end - 1, -1):
+                if any(self.is_solid(c, r) for r in range(r0, r1 + 1)):
+                    return (c + 1) * t + hw
+        return x + dx
+
+    def _sweep_y(self, x, y, hw, hh, dy):
+        if dy == 0:
+            return y
+        t = self.tile
+        c0 = math.floor((x - hw) / t)
+        c1 = math.ceil((x + hw) / t) - 1
+        if dy > 0:
+            start = math.ceil((y + hh) / t)
+            end = math.ceil((y + dy + hh) / t) - 1
+            for r in range(start, end + 1):
+                if any(self.is_solid(c, r) for c in range(c0, c1 + 1)):
+                    return r * t - hh
+        else:
+            start = math.floor((y - hh) / t) - 1
+            end = math.floor((y + dy - hh) / t)
+            for r in range(start, end - 1, -1):
+                if any(self.is_solid(c, r) for c in range(c0, c1 + 1)):
+                    return (r + 1) * t + hh
+        return y + dy
+
+    # ---- Move-and-slide (batched) ----
+    def move_and_slide_many(self, pos: np.ndarray, half: float, delta: np.ndarray):
+        """Batched move-and-slide for square movers, updating ``pos`` in place.
+
+        Requires ``half <= tile / 2`` so a box spans at most two rows/columns.
+        Steps longer than a tile are split into tile-sized sub-steps.
+        """
+        if len(pos) == 0:
+            return
+        longest = float(np.abs(delta).max())
+        steps = max(1, math.ceil(longest / (self.tile * 0.99)))
+        step = delta / steps
+        for _ in range(steps):
+            self._slide_axis(pos, half, step[:, 0], 0)
+            self._slide_axis(pos, half, step[:, 1], 1)
+
+    def _slide_axis(self, pos, half, d, axis):
+        t = self.tile
+        along = pos[:, axis]
+        across = pos[:, 1 - axis]
+        forward = d > 0
+        lead = along + np.where(forward, half, -half)
+        new_lead = lead + d
+        cur = np.where(forward, np.ceil(lead / t) - 1, np.floor(lead / t))
+        new = np.where(forward, np.ceil(new_lead / t) - 1, np.floor(new_lead / t))
+        entering = (new != cur) & (d != 0)
+
+        lo = np.floor((across - half) / t)
+        hi = np.ceil((across + half) / t) - 1
+        if axis == 0:
+            hit = entering & (self._solid_at(new, lo) | self._solid_at(new, hi))
+        else:
+            hit = entering & (self._solid_at(lo, new) | self._solid_at(hi, new))
+
+        flush = np.where(forward, new * t - half, (new + 1) * t + half)
+        pos[:, axis] = np.where(hit, flush, along + d)
+
+    def _solid_at(self, cols: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        c = cols.astype(np.intp)
+        r = rows.astype(np.intp)
+        inside = (c >= 0) & (c < self.cols) & (r >= 0) & (r < self.rows)
+        out = ~inside
+        out[inside] = self.solid[r[inside], c[inside]] != 0
+        return out
+
+    # ---- Segment sweeps ----
+    def sweep_segment(self, x0: float, y0: float, x1: float, y1: float) -> float:
+        """Scalar `sweep_segments` for one segment (same cells, same t)."""
+        t = self.tile
+        dx, dy = x1 - x0, y1 - y0
+        c, r = math.floor(x0 / t), math.floor(y0 / t)
+        if self.is_solid(c, r):
+            return 0.0
+        sx = (dx > 0) - (dx < 0)
+        sy = (dy > 0) - (dy < 0)
+        tx = ((c + (sx > 0)) * t - x0) / dx if dx else math.inf
+        ty = ((r + (sy > 0)) * t - y0) / dy if dy else math.inf
+        ddx = t / abs(dx) if dx else math.inf
+        ddy = t / abs(dy) if dy else math.inf
+        while True:
+            if ty < tx:
+                if ty > 1.0:
+                    return math.inf
+                r += sy
+                hit, ty = ty, ty + ddy
+            else:
+                if tx > 1.0:
+                    return math.inf
+                c += sx
+                hit, tx = tx, tx + ddx
+            if self.is_solid(c, r):
+                return hit
+
+    def sweep_segments(self, p0: np.ndarray, p1: np.ndarray) -> np.ndarray:
+        """First wall hit along each segment p0[i] -> p1[i].
+
+        Grid DDA run for all segments in lockstep. Returns the segment
+        parameter t in [0, 1] where each one enters a solid cell, or inf if it
+        stays clear. Every crossed cell is visited, so nothing tunnels.
+        """
+        n = len(p0)
+        result = np.full(n, np.inf)
+        if n == 0:
+            return result
+        t = self.tile
+        d = p1 - p0
+        cell = np.floor(p0 / t)
+        step = np.sign(d)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            boundary = (cell + (step > 0)) * t
+            t_max = np.where(d != 0, (boundary - p0) / d, np.inf)
+            t_delta = np.where(d != 0, t / np.abs(d), np.inf)
+
+        start_solid = self._solid_at(cell[:, 0], cell[:, 1])
+        result[start_solid] = 0.0
+        active = np.nonzero(~start_solid)[0]
+        while len(active):
+            tm = t_max[active]
+            axis = (tm[:, 1] < tm[:, 0]).astype(np.intp)
+            t_next = tm[np.arange(len(active)), axis]
+            keep = t_next <= 1.0
+            active, axis, t_next = active[keep], axis[keep], t_next[keep]
+            if not len(active):
+                break
+            cell[active, axis] += step[active, axis]
+            t_max[active, axis] += t_delta[active, axis]
+            hit = self._solid_at(cell[active, 0], cell[active, 1])
+            result[active[hit]] = t_next[hit]
+            active = active[~hit]
+        return result
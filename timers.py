@@ -0,0 +1,40 @@
+class TimerWheel:
+    """Hashed timer wheel on the fixed tick: O(1) schedule, O(due) per tick.
+
+    Entries land in bucket ``due_tick % slots``; delays longer than the
+    wheel share a bucket with nearer ones and simply wait for their tick.
+    There is no cancel: owners drop stale entries when they fire (keep a
+    serial or a deadline next to the data the timer is about).
+    """
+
+    def __init__(self, slots: int = 512):
+        self.buckets: list[list[tuple[int, object]]] = [[] for _ in range(slots)]
+        self.tick = 0
+        self.size = 0
+
+    def schedule(self, delay: int, item):
+        """Fire ``item`` ``delay`` ticks from now (at least one)."""
+        due = self.tick + max(1, delay)
+        self.buckets[due % len(self.buckets)].append((due, item))
+        self.size += 1
+
+    def advance(self) -> list:
+        """Move to the next tick; returns the items due on it, in schedule order."""
+        self.tick += 1
+        bucket = self.buckets[self.tick % len(self.buckets)]
+        if not bucket:
+            return []
+        tick = self.tick
+        due = [item for t, item in bucket if t == tick]
+        if len(due) == len(bucket):
+            bucket.clear()
+        else:
+            bucket[:] = [entry for entry in bucket if entry[0] != tick]
+        self.size -= len(due)
+        return due
+
+    def clear(self):
+        for bucket in self.buckets:
+            bucket.clear()
+        self.tick = 0
+        self.size = 0
@@ -0,0 +1,102 @@
+class WaveScheduler:
+    """Round loop driven by ``data/waves.json``: its rounds in file order, repeating.
+
+    At round start the round's waves are flattened into one timeline of
+    (time, enemy) spawns, and the enemy buffers and handles are reserved
+    for the round's peak so spawning never reallocates mid-fight.
+    `update()` releases at most ``spawns_per_tick`` due entries per tick, so
+    a large wave is spread over a few ticks instead of landing in one.
+    Between rounds it keeps the player's flow field warm (one budgeted
+    slice per tick) so the next round's first spawns do not also pay for
+    a path search.
+    """
+
+    def __init__(self, sim, spawns_per_tick: int = 4, intermission: float = 3.0):
+        self.sim = sim
+        self.spawns_per_tick = spawns_per_tick
+        self.intermission = intermission  # s between "Round Clear!" and the next round
+        self.first_round = 0  # Index of the round `begin()` starts with
+        self.reset()
+
+    def reset(self):
+        """Back to before Round 1 (call `begin()` to start it)."""
+        self.stage = 1  # Completed passes through the round list + 1
+        self.round_index = -1
+        self.round_name = ""
+        self.round_time = 0.0
+        self.live = False
+        self._timeline: list[tuple[float, str]] = []
+        self._next = 0
+        self._break = 0.0
+
+    @property
+    def pending(self) -> int:
+        """Spawns of the current round not released yet."""
+        return len(self._timeline) - self._next
+
+    def pending_kinds(self) -> set[str]:
+        """Enemy kinds among the current round's unreleased spawns."""
+        return {enemy for _, enemy in self._timeline[self._next:]}
+
+    def begin(self):
+        self._start_round(self.first_round)
+
+    def _start_round(self, index: int):
+        sim = self.sim
+        rounds = sim.tables.waves
+        names = list(rounds)
+        if index >= len(names):
+            index = 0
+            self.stage += 1
+        name = names[index]
+        timeline = []
+        for wave in rounds[name]:
+            if wave.enemy not in sim.tables.enemies:
+                raise ValueError(f"waves.{name}: unknown enemy {wave.enemy!r}")
+            timeline.extend((wave.at + j * wave.interval, wave.enemy) for j in range(wave.count))
+        timeline.sort(key=lambda entry: entry[0])
+
+        self.round_index = index
+        self.round_name = name
+        self.round_time = 0.0
+        self.live = True
+        self._timeline = timeline
+        self._next = 0
+        sim.prewarm_enemies(sim.enemies.count + len(timeline))
+        sim.round_active = True
+        sim.round_message = name if self.stage == 1 else f"{name} (stage {self.stage})"
+        self._release()
+
+    def update(self, dt: float):
+        sim = self.sim
+        if not self.live:
+            sim.flow.set_goal(*sim.grid.tile_of(sim.player.center_x, sim.player.center_y), budget=True)
+            self._break -= dt
+            if self._break <= 0:
+                self._start_round(self.round_index + 1)
+            return
+        self.round_time += dt
+        self._release()
+        if self.pending == 0 and sim.enemies.count == 0:
+            self.live = False
+            self._break = self.intermission
+            sim.round_active = False
+            sim.round_message = "Round Clear!"
+
+    def _release(self):
+        timeline, start = self._timeline, self._next
+        end = start
+        limit = min(len(timeline), start + self.spawns_per_tick)
+        while end < limit and timeline[end][0] <= self.round_time:
+            end += 1
+        if end == start:
+            return
+        sim = self.sim
+        points = sim.spawns.sample(
+            end - start, sim.rng, (sim.player.center_x, sim.player.center_y),
+            sim.spawn_safe_radius, sim.spawn_min_steps, sim.spawn_spread,
+        )
+        # Points the map could not fit stay queued for the next tick
+        for (x, y), (_, enemy) in zip(points, timeline[start:end]):
+            sim.spawn_enemy(x, y, enemy)
+        self._next = start + len(points)